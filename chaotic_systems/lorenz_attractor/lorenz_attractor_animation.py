@@ -1,41 +1,16 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import c2p_array, Trail, DensityImage
 
 
 # global parameters
 n_particles = 3
 speed_numerical = 1
-
-
-# processing data
-numerical_data = np.loadtxt("data/lorenz_data.csv", delimiter = ",", skiprows = 1)
-
-x1_array = numerical_data[:,1]
-y1_array = numerical_data[:,2]
-z1_array = numerical_data[:,3]
-
-x2_array = numerical_data[:,4]
-y2_array = numerical_data[:,5]
-z2_array = numerical_data[:,6]
-
-x3_array = numerical_data[:,7]
-y3_array = numerical_data[:,8]
-z3_array = numerical_data[:,9]
-
-print(x1_array)
-
-
-# # generating iters for each trajectoy and coordinate
-x1_iter = iter(x1_array[::speed_numerical])
-y1_iter = iter(y1_array[::speed_numerical])
-z1_iter = iter(z1_array[::speed_numerical])
-
-x2_iter = iter(x2_array[::speed_numerical])
-y2_iter = iter(y2_array[::speed_numerical])
-z2_iter = iter(z2_array[::speed_numerical])
-
-x3_iter = iter(x3_array[::speed_numerical])
-y3_iter = iter(y3_array[::speed_numerical])
-z3_iter = iter(z3_array[::speed_numerical])
+line_stride = 100
+run_time = 20
+render_mode = "trails"                          # "trails": growing polylines, "density": log-scaled density images of every row
 
 
 class lorenz_attractor_scene(ThreeDScene):
@@ -62,32 +37,27 @@ class lorenz_attractor_scene(ThreeDScene):
                     ).rotate(axis = [1, 0, 0], angle = PI/20).rotate(
                         axis = [0, 1, 0], angle = PI/20
                         ).set_opacity(0.2)
-        
+
+
+        # lazily opened data for the dots
+        lorenz_data = Dataset("data/lorenz_data.csv", stride = speed_numerical)
 
         # initialize trajectories
-        traj1 = Dot(point = ax.c2p(x1_array[0], y1_array[0], z1_array[0]), radius = 0.02, color = WHITE).set_opacity(0.2)
+        traj1 = Dot(point = ax.c2p(*lorenz_data[0, 1:4]), radius = 0.02, color = WHITE).set_opacity(0.2)
         traj1.color = WHITE
-        traj1.x_iter = x1_iter
-        traj1.y_iter = y1_iter
-        traj1.z_iter = z1_iter
+        traj1.iter = lorenz_data.iter_rows(["x1", "y1", "z1"])
 
-        traj2 = Dot(point = ax.c2p(x2_array[0], y2_array[0], z2_array[0]), radius = 0.02, color = RED).set_opacity(0.2)
+        traj2 = Dot(point = ax.c2p(*lorenz_data[0, 4:7]), radius = 0.02, color = RED).set_opacity(0.2)
         traj2.color = RED
-        traj2.x_iter = x2_iter
-        traj2.y_iter = y2_iter
-        traj2.z_iter = z2_iter
+        traj2.iter = lorenz_data.iter_rows(["x2", "y2", "z2"])
 
-        traj3 = Dot(point = ax.c2p(x3_array[0], y3_array[0], z3_array[0]), radius = 0.02, color = BLUE).set_opacity(0.2)
+        traj3 = Dot(point = ax.c2p(*lorenz_data[0, 7:10]), radius = 0.02, color = BLUE).set_opacity(0.2)
         traj3.color = BLUE
-        traj3.x_iter = x3_iter
-        traj3.y_iter = y3_iter
-        traj3.z_iter = z3_iter
+        traj3.iter = lorenz_data.iter_rows(["x3", "y3", "z3"])
 
 
         def traj_updater(traj):
-            x = next(traj.x_iter)
-            y = next(traj.y_iter)
-            z = next(traj.z_iter)
+            x, y, z = next(traj.iter)
             color = traj.color
             #self.add(Line(start = traj.get_center(), end = ax.c2p(x, y, z), stroke_width = 1, color = color).set_opacity(0.5))
             #traj.move_to([x, y, z])
@@ -111,9 +81,39 @@ class lorenz_attractor_scene(ThreeDScene):
 
         # self.wait(5)
 
-        for i in range(0, 1000000-1, 100):
-            if i % 5000 == 0:
-                print(f"Count: {i}\n")
-            self.add(Line(start = ax.c2p(x1_array[i], y1_array[i], z1_array[i]), end = ax.c2p(x1_array[i+1], y1_array[i+1], z1_array[i+1]), stroke_width = 1, color = WHITE).set_opacity(0.5))
-            # self.add(Line(start = ax.c2p(x2_array[i], y2_array[i], z2_array[i]), end = ax.c2p(x1_array[i+1], y1_array[i+1], z1_array[i+1]), stroke_width = 1, color = RED).set_opacity(0.5))
-            # self.add(Line(start = ax.c2p(x3_array[i], y3_array[i], z3_array[i]), end = ax.c2p(x1_array[i+1], y1_array[i+1], z1_array[i+1]), stroke_width = 1, color = BLUE).set_opacity(0.5))
\ No newline at end of file
+        # log-scaled density of every row of every trajectory as seen by the camera (blocks of rows of the memory-mapped binary cache)
+        if render_mode == "density":
+            frame_x_range = (-config.frame_width / 2, config.frame_width / 2)
+            frame_y_range = (-config.frame_height / 2, config.frame_height / 2)
+            density_bins = (config.pixel_width // 2, config.pixel_height // 2)
+            densities = Group(*[
+                DensityImage(np.zeros((0, 3)), frame_x_range, frame_y_range, bins = density_bins, color = color)
+                for color in [WHITE, RED, BLUE][:n_particles]
+                ])
+            density_data = Dataset("data/lorenz_data.csv").data
+            for block_start in range(0, len(density_data), 100000):
+                block = np.array(density_data[block_start:block_start+100000,1:])
+                for i, density in enumerate(densities):
+                    density.add_density_points(c2p_array(ax, block[:,3*i:3*i+3]))
+            self.play(FadeIn(densities), run_time = 3)
+            self.wait(5)
+            return
+
+        # one polyline trail per trajectory from every 'line_stride'-th row of the memory-mapped cache, grown over the animation
+        trail_array = Dataset("data/lorenz_data.csv", stride = line_stride)[:,1:]
+        trails = VGroup(*[
+            Trail.from_coords(ax, trail_array[:,3*i:3*i+3], stroke_width = 1, color = color).set_opacity(0.5).set_n_points(1)
+            for i, color in enumerate([WHITE, RED, BLUE][:n_particles])
+            ])
+        trail_timeline = ValueTracker(0)
+
+        def trail_updater(trail):
+            trail.set_progress(trail_timeline.get_value() / run_time)
+
+        for trail in trails:
+            trail.add_updater(trail_updater)
+        self.add(trails)
+        self.play(trail_timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
+        for trail in trails:
+            trail.remove_updater(trail_updater)
+        self.wait(5)
@@ -0,0 +1,145 @@
+import time
+import functools
+import multiprocessing
+import numpy as np
+
+
+# parameters (same as in nonlinear_map.c)
+mu_start = 0                                                            # mu start
+mu_end = 4                                                              # mu end
+delta_mu = 0.005                                                        # mu discretization
+
+x_start = 0.6                                                           # initial value for x
+N = 60                                                                  # maximum number of iterations over the map
+long_N = 60+1                                                           # number of long-term values stored and fourier-transformed
+
+lyapunov_N_transient = 500                                              # iterations discarded before the lyapunov exponent is accumulated
+lyapunov_N = 2000                                                       # iterations over which the lyapunov exponent is averaged
+lyapunov_chunk_size = 100000                                            # growth rates iterated at once by the chunked lyapunov map
+
+
+# returns the array of growth rates mu from 'mu_start' to 'mu_end' (inclusive) in steps of 'delta_mu'
+def get_mu_array(mu_start = mu_start, mu_end = mu_end, delta_mu = delta_mu):
+    return mu_start + delta_mu * np.arange(int(round((mu_end - mu_start) / delta_mu)) + 1)
+
+
+# returns the next map entries x_{n+1} for given x_n (element-wise for arrays of x_n and mu)
+def get_nonlinear_next(x_n, mu):
+    return mu*x_n * (1-x_n)
+
+
+# iterates the logistic map for all growth rates in 'mu_array' at once (vector over mu, loop over n) and returns the values x_0 to x_N
+# (dim 0: mu, dim 1: n); the iterations are written in place into one preallocated array, one contiguous row per n
+def get_nonlinear_map(mu_array, x_start = x_start, N = N):
+    mu_array = np.asarray(mu_array, dtype = float)
+    x_n_array = np.empty((N + 1, len(mu_array)))
+    buffer = np.empty(len(mu_array))
+    x_n_array[0] = x_start
+    for n in range(N):
+        np.subtract(1, x_n_array[n], out = buffer)
+        np.multiply(buffer, x_n_array[n], out = buffer)
+        np.multiply(buffer, mu_array, out = x_n_array[n+1])
+    return x_n_array.T
+
+
+# returns the last 'long_N' values of 'x_n_array' and their discrete fourier transform (real part, as stored by cvc_dft)
+def get_long_term(x_n_array, long_N = long_N):
+    x_n_long_array = x_n_array[:,-long_N:]
+    k_n_long_array = np.fft.fft(x_n_long_array, axis = 1).real
+    return x_n_long_array, k_n_long_array
+
+
+# returns the frequencies (in cycles per iteration) and the power spectra of all rows of 'x_n_long_array' (dim 0: mu, dim 1: n) in one
+# real fft over the whole matrix
+def get_power_spectrum(x_n_long_array):
+    x_n_long_array = np.asarray(x_n_long_array, dtype = float)
+    long_N = x_n_long_array.shape[1]
+    frequency_array = np.fft.rfftfreq(long_N)
+    power_array = np.abs(np.fft.rfft(x_n_long_array, axis = 1))**2 / long_N
+    return frequency_array, power_array
+
+
+# returns the lyapunov exponents lambda = <log|f'(x_n)|> = <log|mu (1 - 2 x_n)|> of all growth rates in 'mu_array' at once, averaged over
+# 'N' iterations after 'N_transient' discarded ones (only a few arrays of the size of 'mu_array' are held, whatever 'N')
+def get_lyapunov(mu_array, x_start = x_start, N_transient = lyapunov_N_transient, N = lyapunov_N):
+    mu_array = np.asarray(mu_array, dtype = float)
+    x_n = np.full(len(mu_array), float(x_start))
+    buffer = np.empty(len(mu_array))
+    log_sum = np.zeros(len(mu_array))
+    for n in range(N_transient + N):
+        if n >= N_transient:
+            np.multiply(x_n, -2, out = buffer)
+            np.add(buffer, 1, out = buffer)
+            np.multiply(buffer, mu_array, out = buffer)
+            np.abs(buffer, out = buffer)
+            np.maximum(buffer, np.finfo(float).tiny, out = buffer)          # superstable points (f'(x_n) = 0): large negative, not -inf
+            log_sum += np.log(buffer, out = buffer)
+        np.subtract(1, x_n, out = buffer)
+        np.multiply(buffer, x_n, out = buffer)
+        np.multiply(buffer, mu_array, out = x_n)
+    return log_sum / N
+
+
+# streams the lyapunov exponents of the growth rates in 'mu_array' as pairs (mu chunk, lambda chunk) of at most 'chunk_size' growth rates,
+# computed by 'processes' worker processes in parallel (1: in this process), so the memory is bounded by the chunks in flight
+def iter_lyapunov_chunks(mu_array, chunk_size = lyapunov_chunk_size, processes = 1, x_start = x_start, N_transient = lyapunov_N_transient, N = lyapunov_N):
+    mu_chunks = (mu_array[i:i+chunk_size] for i in range(0, len(mu_array), chunk_size))
+    get_chunk_lyapunov = functools.partial(get_lyapunov, x_start = x_start, N_transient = N_transient, N = N)
+    if processes == 1:
+        for mu_chunk in mu_chunks:
+            yield mu_chunk, get_chunk_lyapunov(mu_chunk)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        mu_chunks = list(mu_chunks)
+        yield from zip(mu_chunks, pool.imap(get_chunk_lyapunov, mu_chunks))
+
+
+# returns the lyapunov exponents of all growth rates in 'mu_array' computed chunk by chunk (see 'iter_lyapunov_chunks')
+def get_lyapunov_map(mu_array, chunk_size = lyapunov_chunk_size, processes = 1, x_start = x_start, N_transient = lyapunov_N_transient, N = lyapunov_N):
+    mu_array = np.asarray(mu_array, dtype = float)
+    lambda_array = np.empty(len(mu_array))
+    i = 0
+    for mu_chunk, lambda_chunk in iter_lyapunov_chunks(mu_array, chunk_size, processes, x_start, N_transient, N):
+        lambda_array[i:i+len(mu_chunk)] = lambda_chunk
+        i += len(mu_chunk)
+    return lambda_array
+
+
+# returns the arrays of nonlinear_map_data.csv (mu, x_n), nonlinear_map_long_x_data.csv and nonlinear_map_long_k_data.csv in memory
+# (computed once per set of parameters, the cached arrays are read-only)
+@functools.lru_cache(maxsize = 8)
+def get_nonlinear_map_data(mu_start = mu_start, mu_end = mu_end, delta_mu = delta_mu, x_start = x_start, N = N, long_N = long_N):
+    mu_array = get_mu_array(mu_start, mu_end, delta_mu)
+    x_n_array = get_nonlinear_map(mu_array, x_start, N)
+    x_n_long_array, k_n_long_array = get_long_term(x_n_array, long_N)
+    return set_read_only(mu_array, x_n_array, x_n_long_array, k_n_long_array)
+
+
+# returns the growth rates, the frequencies and the power spectra of the long-term values of all growth rates (computed once per set of
+# parameters, the cached arrays are read-only)
+@functools.lru_cache(maxsize = 8)
+def get_nonlinear_map_spectrum(mu_start = mu_start, mu_end = mu_end, delta_mu = delta_mu, x_start = x_start, N = N, long_N = long_N):
+    mu_array, _, x_n_long_array, _ = get_nonlinear_map_data(mu_start, mu_end, delta_mu, x_start, N, long_N)
+    return set_read_only(mu_array, *get_power_spectrum(x_n_long_array))
+
+
+# marks the given arrays as read-only (so the cached arrays cannot be altered by their users) and returns them
+def set_read_only(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+# timing of a sweep over 'n_mu' growth rates with 'n_iterations' iterations each
+if __name__ == "__main__":
+    n_mu = 10000
+    n_iterations = 1000
+    mu_array = np.linspace(mu_start, mu_end, n_mu)
+    start_time = time.perf_counter()
+    x_n_array = get_nonlinear_map(mu_array, x_start, n_iterations)
+    print(f"{n_mu} mu x {n_iterations} iterations: {time.perf_counter() - start_time:.3f} s")
+
+    n_lyapunov_mu = 10**6
+    start_time = time.perf_counter()
+    lambda_array = get_lyapunov_map(np.linspace(mu_start, mu_end, n_lyapunov_mu), processes = multiprocessing.cpu_count())
+    print(f"lyapunov exponents of {n_lyapunov_mu} mu: {time.perf_counter() - start_time:.3f} s")
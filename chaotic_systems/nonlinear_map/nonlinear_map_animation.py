@@ -1,25 +1,17 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import c2p_array, Trail, BatchedDots, PointCloud, DensityImage
+from nonlinear_map import get_nonlinear_map_data, get_nonlinear_map_spectrum, get_power_spectrum, get_mu_array, get_lyapunov_map
 
 
-# data processing
-nonlinear_map_data = np.loadtxt(f"data/nonlinear_map_data.csv", delimiter = ",", skiprows = 1)
-nonlinear_map_long_x_data = np.loadtxt(f"data/nonlinear_map_long_x_data.csv", delimiter = ",", skiprows = 1)
-nonlinear_map_long_k_data = np.loadtxt(f"data/nonlinear_map_long_k_data.csv", delimiter = ",", skiprows = 1)
+# source of the map data ("python": iterated in memory by nonlinear_map.py, "csv": the files written by nonlinear_map.c)
+data_source = "python"
 
 
-# bifurcation data
-mu_array = nonlinear_map_data[:,0]
-x_n_array = nonlinear_map_data[:,1:]
-x_n_bifurcation_array = nonlinear_map_data[:,30:]
-n_array = np.array([i for i in range(len(x_n_array[0]))])
-
-
-# long-term data
-mu_long_array = nonlinear_map_long_x_data[:,0]
-x_n_long_array = nonlinear_map_long_x_data[:,1:]
-k_n_long_array = nonlinear_map_long_k_data[:,1:]
-n_long_array = np.array([i for i in range(len(x_n_long_array[0]))])
-
+# rendering of the bifurcation diagram ("cloud": every value as a point, "density": log-scaled density image of the values)
+bifurcation_mode = "cloud"
 
 
 class BifurcationDiagram(Mobject):
@@ -61,16 +53,70 @@ class BifurcationDiagram(Mobject):
         return line
     
 
-    # draw point for every long-term value in the array
+    # returns the scene points of the long-term values 'x_n_array' (dim 0: mu, dim 1: n) of every mu in 'mu_array' (one array operation)
+    def get_points(self, mu_array, x_n_array):
+        x_n_array = np.atleast_2d(x_n_array)
+        mu_coords = np.repeat(np.atleast_1d(mu_array), x_n_array.shape[1])
+        return c2p_array(self.ax, np.column_stack((mu_coords, x_n_array.ravel())))
+
+
+    # draw point for every long-term value in the array (one mobject for all of them)
     def get_long_xn(self, mu, x_n):
-        dot_group = VGroup()
-        for x_n_i in x_n:
-            dot = self.get_dot(mu, x_n_i)
-            dot_group.add(dot)
-        return dot_group
+        return BatchedDots(self.get_points(mu, x_n), radius = 0.0075, color = BLUE)
+
+
+    # returns the point cloud of the long-term values 'x_n_array' of every mu in 'mu_array', optionally only where 'mask' is set
+    def get_point_cloud(self, mu_array, x_n_array, mask = None, stroke_width = 2):
+        points = self.get_points(mu_array, x_n_array)
+        if mask is not None:
+            points = points[np.ravel(mask)]
+        return PointCloud(points, color = BLUE, stroke_width = stroke_width)
+
+
+    # returns the log-scaled density image of the long-term values 'x_n_array' of every mu in 'mu_array' over the whole diagram
+    def get_density_image(self, mu_array, x_n_array, mask = None, bins = (1000, 450)):
+        points = self.get_points(mu_array, x_n_array)
+        if mask is not None:
+            points = points[np.ravel(mask)]
+        lower_left, upper_right = self.ax.c2p(self.x_range[0], self.y_range[0]), self.ax.c2p(self.x_range[1], self.y_range[1])
+        return DensityImage(points, (lower_left[0], upper_right[0]), (lower_left[1], upper_right[1]), bins = bins, color = BLUE)
     
 
 
+class LyapunovDiagram(Mobject):
+    def __init__(self, center, x_range, y_range, x_length, y_length, **kwargs):
+        super().__init__(**kwargs)
+
+        self.center = center
+        self.x_range = x_range
+        self.y_range = y_range
+        self.x_length = x_length
+        self.y_length = y_length
+
+        x_coord = [0, 1, 2, 3, 4]
+        y_coord = list(range(int(y_range[0]), int(y_range[1]) + 1))
+
+        x_dict = dict(zip(x_coord, x_coord))
+        y_dict = dict(zip(y_coord, y_coord))
+
+
+        self.ax = Axes(
+            x_range = self.x_range, y_range = self.y_range, x_length = self.x_length, y_length = self.y_length, axis_config = {"tip_width": 0.15, "tip_height": 0.15},
+            x_axis_config = {"stroke_opacity": 0}
+            ).add_coordinates(x_dict, y_dict).move_to(self.center)
+        self.ax_xlabel = self.ax.get_x_axis_label(Tex(r"$\mu$", font_size = 28)).shift(0.1 *LEFT)
+        self.ax_ylabel = self.ax.get_y_axis_label(Tex(r"$\lambda$", font_size = 28)).shift(0.15 * DOWN)
+        self.zero_line = DashedLine(self.ax.c2p(self.x_range[0], 0), self.ax.c2p(self.x_range[1], 0), stroke_width = 2, stroke_opacity = 0.5)
+        self.add(self.ax, self.ax_xlabel, self.ax_ylabel, self.zero_line)
+
+
+    # returns the curve of the lyapunov exponents 'lambda_array' over 'mu_array' (clipped to the diagram, growable mu by mu)
+    def get_lyapunov_curve(self, mu_array, lambda_array):
+        coords = np.column_stack((mu_array, np.clip(lambda_array, self.y_range[0], self.y_range[1])))
+        return Trail.from_coords(self.ax, coords, stroke_color = YELLOW, stroke_width = 2)
+
+
+
 class SpaceDiagram(Mobject):
     def __init__(self, center, x_range, y_range, x_length, y_length, x_label, y_label, space = "real", **kwargs):
         super().__init__(**kwargs)
@@ -103,18 +149,19 @@ class SpaceDiagram(Mobject):
         self.add(self.ax)
 
 
-    # makes a plot given n- and x_n-array
+    # makes a plot given n- and x_n-array (one polyline)
     def make_plot(self, x_array, y_array, plot_color):
-        plot_group = VGroup()
+        plot = VMobject(stroke_color = plot_color, stroke_opacity = 0.75)
+        return self.set_plot(plot, x_array, y_array)
+
+
+    # moves the polyline of the plot 'plot' through the new points in place
+    def set_plot(self, plot, x_array, y_array):
         max_y = max(abs(y_array))
         if max_y > 2:
-            y_array /= (max_y/2)
-        for i in range(len(x_array)-1):
-            point_prior = self.ax.c2p(x_array[i], y_array[i])
-            point = self.ax.c2p(x_array[i+1], y_array[i+1])
-            connector = Line(start = point_prior, end = point, color = plot_color, stroke_opacity = 0.75)
-            plot_group.add(connector)
-        return plot_group
+            y_array = y_array / (max_y/2)
+        plot.set_points_as_corners(c2p_array(self.ax, np.column_stack((x_array, y_array))))
+        return plot
 
 
 
@@ -134,32 +181,105 @@ class bifurcation_scene(Scene):
         x_length = 10
         y_length = 4.5
 
+        # bifurcation data (the values from x_29 on)
+        if data_source == "python":
+            mu_array, x_n_array, _, _ = get_nonlinear_map_data()
+            x_n_bifurcation_array = x_n_array[:,29:]
+        else:
+            nonlinear_map_data = Dataset("data/nonlinear_map_data.csv")
+            mu_array = nonlinear_map_data.column("mu")
+            x_n_bifurcation_array = nonlinear_map_data[:,30:]
+
         bifurcation_diagram = BifurcationDiagram(center = diagram_center, x_range = x_range, y_range = y_range, x_length = x_length, y_length = y_length)
         bifurcation_dot = bifurcation_diagram.get_dot(0, 0)
         self.add(bifurcation_diagram, bifurcation_dot)
 
 
-        # animation
+        # long-term values shown per mu (the last 2 below 'mu_edge_1', the last 5 below 'mu_edge_2', all above) and the time spent
+        # on each mu (scaled to the mu resolution of nonlinear_map.c, so the animation length does not depend on it)
         mu_edge_1 = 2.5
         mu_edge_2 = 3.5
-        self.wait(1.5)
-        for i, mu in enumerate(mu_array):
-            new_mu = mu
-            new_x_n = x_n_bifurcation_array[i]
-            # replace dot
-            # self.remove(bifurcation_dot)
-            if mu < mu_edge_1:
-                bifurcation_dot = bifurcation_diagram.get_long_xn(new_mu, new_x_n[-2:])
-                self.add(bifurcation_dot)
-                self.wait(0.02)
-            elif mu < mu_edge_2:
-                bifurcation_dot = bifurcation_diagram.get_long_xn(new_mu, new_x_n[-5:])
-                self.add(bifurcation_dot)
-                self.wait(0.05)
+        n_shown_array = np.where(mu_array < mu_edge_1, 2, np.where(mu_array < mu_edge_2, 5, x_n_bifurcation_array.shape[1]))
+        shown_mask = np.arange(x_n_bifurcation_array.shape[1]) >= x_n_bifurcation_array.shape[1] - n_shown_array[:,np.newaxis]
+        mu_time_array = np.where(mu_array < mu_edge_1, 0.02, np.where(mu_array < mu_edge_2, 0.05, 0.1)) * (mu_array[1] - mu_array[0]) / 0.005
+
+        # the whole diagram as one point cloud or density image, revealed mu by mu
+        cloud_end_array = np.cumsum(n_shown_array)
+        cloud_time_array = np.cumsum(mu_time_array)
+        timeline = ValueTracker(0)
+        if bifurcation_mode == "density":
+            bifurcation_cloud = bifurcation_diagram.get_density_image(mu_array, x_n_bifurcation_array, shown_mask)
+            density_pixel_array = bifurcation_cloud.pixel_array.copy()
+            density_n_x = density_pixel_array.shape[1]
+            bifurcation_cloud.pixel_array[:,:,3] = 0
+        else:
+            bifurcation_cloud = bifurcation_diagram.get_point_cloud(mu_array, x_n_bifurcation_array, shown_mask).set_n_points(0)
+        self.add(bifurcation_cloud)
+
+        def bifurcation_updater(cloud):
+            i = np.searchsorted(cloud_time_array, timeline.get_value(), side = "right")
+            if bifurcation_mode == "density":
+                mu_reached = mu_array[i-1] if i > 0 else x_range[0] - 1
+                n_columns = int(np.clip(np.floor((mu_reached - x_range[0]) / (x_range[1] - x_range[0]) * density_n_x) + 1, 0, density_n_x))
+                cloud.pixel_array[:,:n_columns] = density_pixel_array[:,:n_columns]
+                cloud.pixel_array[:,n_columns:,3] = 0
             else:
-                bifurcation_dot = bifurcation_diagram.get_long_xn(new_mu, new_x_n)
-                self.add(bifurcation_dot)
-                self.wait(0.1)
+                cloud.set_n_points(cloud_end_array[i-1] if i > 0 else 0)
+
+
+        # animation
+        self.wait(1.5)
+        bifurcation_cloud.add_updater(bifurcation_updater)
+        self.play(timeline.animate.set_value(cloud_time_array[-1]), rate_func = linear, run_time = cloud_time_array[-1])
+        bifurcation_cloud.remove_updater(bifurcation_updater)
+        self.wait(5)
+
+
+
+class lyapunov_scene(Scene):
+    def construct(self):
+        CVC = Text('CVC', font_size = 12, weight = BOLD, color = WHITE, font = 'Latin Modern Sans').align_on_border(RIGHT + DOWN, buff = 0.2)
+        self.add(CVC) 
+
+        # headline
+        text_nonlinear_map = Title(r"Logistic Map: Lyapunov Exponent", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT) 
+        self.add(text_nonlinear_map)
+
+        x_range = [0, 4, 1]
+        x_length = 10
+        run_time = 20
+        lyapunov_delta_mu = 0.0005                                      # mu discretization of the lyapunov exponent
+
+        # bifurcation data (the values from x_29 on) and the lyapunov exponents on a finer mu grid
+        mu_array, x_n_array, _, _ = get_nonlinear_map_data()
+        x_n_bifurcation_array = x_n_array[:,29:]
+        lyapunov_mu_array = get_mu_array(x_range[0], x_range[1], lyapunov_delta_mu)
+        lambda_array = get_lyapunov_map(lyapunov_mu_array)
+
+        bifurcation_diagram = BifurcationDiagram(center = np.array([0, 0.9, 0]), x_range = x_range, y_range = [0, 1, 0.2], x_length = x_length, y_length = 2.5)
+        lyapunov_diagram = LyapunovDiagram(center = np.array([0, -2.25, 0]), x_range = x_range, y_range = [-3, 1, 1], x_length = x_length, y_length = 2.5)
+        self.add(bifurcation_diagram, lyapunov_diagram)
+
+        # both diagrams revealed together, mu growing linearly in time
+        bifurcation_cloud = bifurcation_diagram.get_point_cloud(mu_array, x_n_bifurcation_array).set_n_points(0)
+        lyapunov_curve = lyapunov_diagram.get_lyapunov_curve(lyapunov_mu_array, lambda_array).set_n_points(1)
+        self.add(bifurcation_cloud, lyapunov_curve)
+        timeline = ValueTracker(x_range[0])
+
+        def bifurcation_updater(cloud):
+            cloud.set_n_points(np.searchsorted(mu_array, timeline.get_value(), side = "right") * x_n_bifurcation_array.shape[1])
+
+        def lyapunov_updater(curve):
+            curve.set_n_points(np.searchsorted(lyapunov_mu_array, timeline.get_value(), side = "right"))
+
+
+        # animation
+        self.wait(1.5)
+        bifurcation_cloud.add_updater(bifurcation_updater)
+        lyapunov_curve.add_updater(lyapunov_updater)
+        self.play(timeline.animate.set_value(x_range[1]), rate_func = linear, run_time = run_time)
+        bifurcation_cloud.remove_updater(bifurcation_updater)
+        lyapunov_curve.remove_updater(lyapunov_updater)
         self.wait(5)
 
 
@@ -174,6 +294,20 @@ class nonlinear_map_scene(Scene):
         self.add(text_nonlinear_map)
 
 
+        # long-term data and their power spectra (all mu in one real fft, without the constant component), each scaled to its maximum
+        if data_source == "python":
+            mu_array, _, x_n_long_array, _ = get_nonlinear_map_data()
+            frequency_array, power_array = get_nonlinear_map_spectrum()[1:]
+        else:
+            nonlinear_map_long_x_data = Dataset("data/nonlinear_map_long_x_data.csv")
+            mu_array = nonlinear_map_long_x_data.column("mu")
+            x_n_long_array = nonlinear_map_long_x_data[:,1:]
+            frequency_array, power_array = get_power_spectrum(x_n_long_array)
+        n_long_array = np.arange(x_n_long_array.shape[1])
+        frequency_array = frequency_array[1:]
+        power_array = power_array[:,1:] / np.maximum(np.max(power_array[:,1:], axis = 1, keepdims = True), 1e-12)
+
+
         # real space diagram parameter
         rs_diagram_center = np.array([-3, -0.5, 0])
         rs_x_range = [0, 60, 10]
@@ -185,12 +319,12 @@ class nonlinear_map_scene(Scene):
 
         # fourier space diagram parameter
         fs_diagram_center = np.array([3, -0.5, 0])
-        fs_x_range = [0, 60, 10]
-        fs_y_range = [-2, 2, 0.5]
+        fs_x_range = [0, 0.5, 0.1]
+        fs_y_range = [0, 1, 0.2]
         fs_x_length = 5
         fs_y_length = 4.5
-        fs_x_label = r"$k$"
-        fs_y_label = False
+        fs_x_label = r"$\omega$"
+        fs_y_label = r"$|k_\omega|^2$"
 
         real_space_diagram = SpaceDiagram(
             center = rs_diagram_center, x_range = rs_x_range, y_range = rs_y_range, x_length = rs_x_length, y_length = rs_y_length, x_label = rs_x_label, y_label = rs_y_label)
@@ -199,10 +333,10 @@ class nonlinear_map_scene(Scene):
         self.add(real_space_diagram, fourier_space_diagram)
 
         real_space_plot = real_space_diagram.make_plot(n_long_array, x_n_long_array[0], RED)
-        fourier_space_plot = fourier_space_diagram.make_plot(n_long_array[1:], k_n_long_array[0,1:], BLUE)
+        fourier_space_plot = fourier_space_diagram.make_plot(frequency_array, power_array[0], BLUE)
         self.add(real_space_plot, fourier_space_plot)
 
-        mu_text = Tex("$\mu={:.2f}$".format(mu_long_array[0]), color = WHITE, font_size = 36).move_to(np.array([0, 2.25, 0]))
+        mu_text = Tex("$\mu={:.2f}$".format(mu_array[0]), color = WHITE, font_size = 36).move_to(np.array([0, 2.25, 0]))
         self.add(mu_text)
 
 
@@ -211,11 +345,11 @@ class nonlinear_map_scene(Scene):
         mu_edge_2 = 3.5
         self.wait(1.5)
         for i, mu in enumerate(mu_array):
-            self.remove(real_space_plot, fourier_space_plot, mu_text)
-            real_space_plot = real_space_diagram.make_plot(n_long_array, x_n_long_array[i], RED)
-            fourier_space_plot = fourier_space_diagram.make_plot(n_long_array[1:], k_n_long_array[i,1:], BLUE)
+            self.remove(mu_text)
+            real_space_diagram.set_plot(real_space_plot, n_long_array, x_n_long_array[i])
+            fourier_space_diagram.set_plot(fourier_space_plot, frequency_array, power_array[i])
             mu_text = Tex("$\mu={:.2f}$".format(mu), color = WHITE, font_size = 36).move_to(np.array([0, 2.25, 0]))
-            self.add(real_space_plot, fourier_space_plot, mu_text)
+            self.add(mu_text)
             if mu < mu_edge_1:
                 self.wait(0.02)
             elif mu < mu_edge_2:
@@ -1,27 +1,42 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import sys
+sys.path.append("../..")
+from cvc_data import load_data, iter_csv_rows, histogram_2d, log_density
+from nonlinear_map import get_nonlinear_map_data, get_nonlinear_map_spectrum, get_power_spectrum, get_mu_array, get_lyapunov_map
 
 
-# data processing
-nonlinear_map_data = np.loadtxt(f"data/nonlinear_map_data.csv", delimiter = ",", skiprows = 1)
-nonlinear_map_long_x_data = np.loadtxt(f"data/nonlinear_map_long_x_data.csv", delimiter = ",", skiprows = 1)
-nonlinear_map_long_k_data = np.loadtxt(f"data/nonlinear_map_long_k_data.csv", delimiter = ",", skiprows = 1)
+mu_i_plot_list = [0, 140, 150, 182, 190]
+mu_long_i = [700]
 
-# data
-mu_array = nonlinear_map_data[:,0]
-x_n_array = nonlinear_map_data[:,1:]
-n_array = np.array([i for i in range(len(x_n_array[0]))])
 
-# long-term data
-mu_long_array = nonlinear_map_long_x_data[:,0]
-x_n_long_array = nonlinear_map_long_x_data[:,1:]
-k_n_long_array = nonlinear_map_long_k_data[:,1:]
-n_long_array = np.array([i for i in range(len(x_n_long_array[0]))])
+# data processing ("python": iterated in memory by nonlinear_map.py, "csv": the files written by nonlinear_map.c)
+data_source = "python"
+
+if data_source == "python":
+    mu_array, x_n_array, x_n_long_all_array, k_n_long_all_array = get_nonlinear_map_data()
+    mu_long_array = mu_array[mu_long_i]
+    x_n_long_array = x_n_long_all_array[mu_long_i]
+    k_n_long_array = k_n_long_all_array[mu_long_i]
+    frequency_array, power_all_array = get_nonlinear_map_spectrum()[1:]
+    power_array = power_all_array[mu_long_i]
+else:
+    nonlinear_map_data = load_data("data/nonlinear_map_data.csv")                 # memory-mapped binary cache
+    mu_array = nonlinear_map_data[:,0]
+    x_n_array = nonlinear_map_data[:,1:]
+
+    # long-term data (streamed, only the rows of 'mu_long_i' are kept in memory)
+    nonlinear_map_long_x_data = np.array([row for i, row in enumerate(iter_csv_rows(f"data/nonlinear_map_long_x_data.csv", chunk_size = 100)) if i in mu_long_i])
+    nonlinear_map_long_k_data = np.array([row for i, row in enumerate(iter_csv_rows(f"data/nonlinear_map_long_k_data.csv", chunk_size = 100)) if i in mu_long_i])
+    mu_long_array = nonlinear_map_long_x_data[:,0]
+    x_n_long_array = nonlinear_map_long_x_data[:,1:]
+    k_n_long_array = nonlinear_map_long_k_data[:,1:]
+    frequency_array, power_array = get_power_spectrum(x_n_long_array)
 
-print(x_n_long_array[5].shape, x_n_array[5].shape, n_long_array.shape, k_n_long_array[5].shape)
+n_array = np.array([i for i in range(len(x_n_array[0]))])
+n_long_array = np.array([i for i in range(len(x_n_long_array[0]))])
 
-mu_i_plot_list = [0, 140, 150, 182, 190]
-mu_long_i = [700]
+print(x_n_long_array[0].shape, x_n_array[5].shape, n_long_array.shape, k_n_long_array[0].shape)
 
 
 # # plotting x_n
@@ -50,8 +65,8 @@ ax[0].grid()
 ax[0].grid(which='minor', color = '#999999', alpha = 0.2, linestyle = '-')
 ax[0].minorticks_on()
 
-ax[0].plot(n_long_array, x_n_long_array[mu_long_i].T, color = "xkcd:red pink", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array[mu_long_i]}")
-# ax[0].plot([1, 2, 3], [1, 2, 3], color = "xkcd:red pink", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array[mu_long_i]}")
+ax[0].plot(n_long_array, x_n_long_array.T, color = "xkcd:red pink", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array}")
+# ax[0].plot([1, 2, 3], [1, 2, 3], color = "xkcd:red pink", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array}")
 
 ax[0].legend()
 ax[0].legend(loc="upper left")
@@ -63,10 +78,46 @@ ax[1].grid()
 ax[1].grid(which='minor', color = '#999999', alpha = 0.2, linestyle = '-')
 ax[1].minorticks_on()
 
-ax[1].plot(n_long_array[1:], k_n_long_array[mu_long_i].T[1:], color = "blue", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array[mu_long_i]}")
+ax[1].plot(frequency_array[1:], power_array.T[1:], color = "blue", alpha = 0.5, linewidth = 2, label = f"µ={mu_long_array}")
 
 ax[1].legend()
 ax[1].legend(loc="upper left")
 
 plt.savefig('visualizations/nonlinear_map_long_xk.pdf', facecolor = 'white', bbox_inches='tight')
-plt.show()
\ No newline at end of file
+plt.show()
+
+
+# plotting the bifurcation diagram as log-scaled density of the long-term x_n (binned in one pass, independent of the number of values)
+mu_step = mu_array[1] - mu_array[0]
+mu_range = (mu_array[0] - mu_step/2, mu_array[-1] + mu_step/2)                  # one bin centered on every mu of the grid
+x_range = (0, 1)
+density_array = log_density(histogram_2d(np.repeat(mu_array, x_n_array[:,30:].shape[1]), x_n_array[:,30:].ravel(), mu_range, x_range, (len(mu_array), 400)))
+
+fig, ax = plt.subplots(figsize=(6,3))
+ax.set_xlabel(r'growth rate $\mu$') 
+ax.set_ylabel(r'long-term $x_n$')
+ax.imshow(density_array, extent = (*mu_range, *x_range), aspect = "auto", cmap = "Blues", interpolation = "nearest")
+
+plt.savefig('visualizations/nonlinear_map_bifurcation_density.pdf', facecolor = 'white', bbox_inches='tight')
+plt.show()
+
+
+# plotting the lyapunov exponent on a fine mu grid below the bifurcation density (chunked, 'processes' > 1 spreads the chunks over cores)
+lyapunov_mu_array = get_mu_array(*mu_range, 0.0005)
+lambda_array = get_lyapunov_map(lyapunov_mu_array, processes = 1)
+
+fig, ax = plt.subplots(2, 1, figsize=(6,5), sharex = True)
+ax[0].set_ylabel(r'long-term $x_n$')
+ax[0].imshow(density_array, extent = (*mu_range, *x_range), aspect = "auto", cmap = "Blues", interpolation = "nearest")
+
+ax[1].set_xlabel(r'growth rate $\mu$') 
+ax[1].set_ylabel(r'lyapunov exponent $\lambda$')
+ax[1].grid()
+ax[1].grid(which='minor', color = '#999999', alpha = 0.2, linestyle = '-')
+ax[1].minorticks_on()
+ax[1].axhline(0, color = "black", linewidth = 1)
+ax[1].plot(lyapunov_mu_array, lambda_array, color = "xkcd:red pink", linewidth = 0.5)
+ax[1].set_ylim(-3, 1)
+
+plt.savefig('visualizations/nonlinear_map_lyapunov.pdf', facecolor = 'white', bbox_inches='tight')
+plt.show()
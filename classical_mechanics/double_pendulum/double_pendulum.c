@@ -1,6 +1,7 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
+#include <string.h>
 #include "../../cvc_numerics.h"
 
 
@@ -27,6 +28,12 @@ const double delta_t = 10e-4;
 const int dimension = 4;                                                // dimension of the state vector
 
 
+// ensemble of double pendulums with initial angles 'THETA1' perturbed by multiples of 'ENSEMBLE_PERTURBATION'
+const int N_ensemble = 1000;                                            // number of pendulums in the ensemble
+const double ENSEMBLE_PERTURBATION = 1e-6;                              // difference in 'THETA1' between neighbouring pendulums
+const int ensemble_stride = 25;                                         // only every 'ensemble_stride'-th time step is written
+
+
 // writes analytical solution for given t and paramters *params in state vector y
 int double_pendulum_analytical(double t, double y[], void *params) {
     // caching the parameters from *params
@@ -67,7 +74,65 @@ int ODE_double_pendulum(double t, const double y[], double f[], void *params) {
 }
 
 
-int main(void) {
+// ODE for 'N' (*params) independent double pendulums with the state vector y = [theta1, theta1_v, theta2, theta2_v] of each pendulum in a row
+int ODE_double_pendulum_ensemble(double t, const double y[], double f[], void *params) {
+    int N = *((int*) params);
+    for (int n = 0; n < N; n++) {
+        ODE_double_pendulum(t, &y[n*dimension], &f[n*dimension], NULL);
+    }
+    return 0;
+}
+
+
+// writes the angles of all pendulums of the ensemble state vector y at time t as one row (t, theta1 and theta2 of every pendulum)
+void write_ensemble_row(FILE* ensemble_file, double t, const double y[]) {
+    fprintf(ensemble_file, "\n%g", t);
+    for (int n = 0; n < N_ensemble; n++) {
+        fprintf(ensemble_file, ", %.10g, %.10g", y[n*dimension], y[n*dimension + 2]);
+    }
+}
+
+
+// integrates the ensemble of 'N_ensemble' double pendulums with perturbed initial angles and writes every 'ensemble_stride'-th time step
+int double_pendulum_ensemble(void) {
+    int N = N_ensemble;
+    double *y_ensemble = (double*) malloc(N * dimension * sizeof(double));
+    if (y_ensemble == NULL) {
+        printf("ERROR! Memory is not available, please add more RAM.");
+        return 1;
+    }
+    for (int n = 0; n < N; n++) {
+        y_ensemble[n*dimension] = THETA1 + n * ENSEMBLE_PERTURBATION;
+        y_ensemble[n*dimension + 1] = THETA1_V;
+        y_ensemble[n*dimension + 2] = THETA2;
+        y_ensemble[n*dimension + 3] = THETA2_V;
+    }
+
+    // setting up the file with its header and the initial state
+    FILE* ensemble_file = fopen("data/double_pendulum_ensemble_data.csv", "w");
+    fprintf(ensemble_file, "t");
+    for (int n = 0; n < N; n++) {
+        fprintf(ensemble_file, ", theta1_%d, theta2_%d", n, n);
+    }
+    double t = 0;
+    write_ensemble_row(ensemble_file, t, y_ensemble);
+
+    // iterating until 't' reaches 'T_max' (all pendulums as one state vector)
+    printf("Ensemble: calculating %d double pendulums ...\n", N);
+    for (int step = 1; t < T_max; step++) {
+        t += delta_t;
+        cvc_rk4_step(t, delta_t, y_ensemble, ODE_double_pendulum_ensemble, N * dimension, &N);
+        if (step % ensemble_stride == 0) {
+            write_ensemble_row(ensemble_file, t, y_ensemble);
+        }
+    }
+    fclose(ensemble_file);
+    free(y_ensemble);
+    return 0;
+}
+
+
+int main(int argc, char *argv[]) {
     double t = 0;                                                       // time variable 't' running until 'T_max'
     double y_numerical[] = {THETA1, THETA1_V, THETA2, THETA2_V};        // numerical state vector
     double y_analytical[] = {THETA1, THETA1_V, THETA2, THETA2_V};       // analytical state vector 
@@ -107,5 +172,10 @@ int main(void) {
     }
     fclose(angel_numerical_file);
     fclose(angel_analytical_file);
+
+    // ensemble of perturbed double pendulums (opt-in: 'make run_ensemble')
+    if (argc > 1 && strcmp(argv[1], "ensemble") == 0) {
+        return double_pendulum_ensemble();
+    }
     return 0;
 }
\ No newline at end of file
@@ -1,40 +1,20 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import c2p_array, PhaseTrace, BatchedLines, BatchedDots
 
 
 # global parameters
 m1 = 1
 m2 = 1
 L = 1.75
-speed_numerical = 15
-speed_analytical = 3
-
-
-# processing data
-numerical_data = np.loadtxt("data/double_pendulum_numerical_data.csv", delimiter = ",", skiprows = 1)
-analytical_data = np.loadtxt("data/double_pendulum_analytical_data.csv", delimiter = ",", skiprows = 1)
-
-theta1_numerical = numerical_data[:,1]
-theta2_numerical = numerical_data[:,3]
-theta1_v_numerical = numerical_data[:,2]
-theta2_v_numerical = numerical_data[:,4]
-
-theta1_analytical = analytical_data[:,1]
-theta2_analytical = analytical_data[:,3]
-theta1_v_analytical = analytical_data[:,2]
-theta2_v_analytical = analytical_data[:,4]
-
-
-# iter for all angels
-theta1_numerical_iter = iter(theta1_numerical[::speed_numerical])
-theta2_numerical_iter = iter(theta2_numerical[::speed_numerical])
-theta1_analytical_iter = iter(theta1_analytical[::speed_analytical])
-theta2_analytical_iter = iter(theta2_analytical[::speed_analytical])
-
-# iter for the phase space
-theta1_numerical_ps_iter = iter(theta1_numerical[::speed_numerical])
-theta2_numerical_ps_iter = iter(theta2_numerical[::speed_numerical])
-theta1_v_numerical_ps_iter = iter(theta1_v_numerical[::speed_numerical])
-theta2_v_numerical_ps_iter = iter(theta2_v_numerical[::speed_numerical])
+run_time = 25
+speed_numerical = 0.9                           # simulation time per second of video (numerical solution)
+speed_analytical = 0.18                         # simulation time per second of video (analytical solution)
+phase_trace_tail = None                         # number of frames of the fading phase space traces (None: full traces)
+speed_ensemble = None                           # simulation time per second of video (ensemble, None: whole simulation)
+ensemble_opacity = 0.2                          # opacity of every single pendulum of the ensemble
 
 
 # calculates relative position of mass for given 'theta'
@@ -42,19 +22,59 @@ def theta_to_coord(theta):
     return L * np.array([np.sin(theta), -np.cos(theta), 0])
 
 
-# returns a double pendulum at 'origin' for given angels and color
-def make_double_pendulum(origin, theta1, theta2, color):
-    pendulum_stroke_opacity = 0.75
-    pendulum_stroke_width = 7.5
-
-    m1_coord = origin + theta_to_coord(theta1)
-    m2_coord = m1_coord + theta_to_coord(theta2)
-    line1 = Line(origin, m1_coord, stroke_opacity = pendulum_stroke_opacity, stroke_width = pendulum_stroke_width, color = RED)
-    line2 = Line(m1_coord, m2_coord, stroke_opacity = pendulum_stroke_opacity, stroke_width = pendulum_stroke_width, color = BLUE)
-    anchor = Dot(origin, color = WHITE, radius = 0.05)
-    mass1 = Dot(m1_coord, color = WHITE, radius = 0.05)
-    mass2 = Dot(m2_coord, color = WHITE, radius = 0.05)
-    return VGroup(line1, line2, anchor, mass1, mass2)
+# double pendulum at 'origin' built once for given angels, moved to new angles by 'set_state'
+class DoublePendulum(VGroup):
+    def __init__(self, origin, theta1 = 0, theta2 = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.origin = np.array(origin, dtype = float)
+        pendulum_stroke_opacity = 0.75
+        pendulum_stroke_width = 7.5
+
+        self.line1 = Line(self.origin, self.origin + DOWN, stroke_opacity = pendulum_stroke_opacity, stroke_width = pendulum_stroke_width, color = RED)
+        self.line2 = Line(self.origin + DOWN, self.origin + 2*DOWN, stroke_opacity = pendulum_stroke_opacity, stroke_width = pendulum_stroke_width, color = BLUE)
+        self.anchor = Dot(self.origin, color = WHITE, radius = 0.05)
+        self.mass1 = Dot(self.origin + DOWN, color = WHITE, radius = 0.05)
+        self.mass2 = Dot(self.origin + 2*DOWN, color = WHITE, radius = 0.05)
+        self.add(self.line1, self.line2, self.anchor, self.mass1, self.mass2)
+        self.set_state(theta1, theta2)
+
+
+    # moves the pendulum to the angles 'theta1' and 'theta2'
+    def set_state(self, theta1, theta2):
+        m1_coord = self.origin + theta_to_coord(theta1)
+        m2_coord = m1_coord + theta_to_coord(theta2)
+        self.line1.put_start_and_end_on(self.origin, m1_coord)
+        self.line2.put_start_and_end_on(m1_coord, m2_coord)
+        self.mass1.move_to(m1_coord)
+        self.mass2.move_to(m2_coord)
+        return self
+
+
+# ensemble of double pendulums at 'origin' for an [n_pendulums, 2] array of angles, drawn as three batched mobjects (upper rods,
+# lower rods and masses) that are moved to new angles by 'set_state'
+class DoublePendulumEnsemble(VGroup):
+    def __init__(self, origin, theta_array, opacity = ensemble_opacity, **kwargs):
+        super().__init__(**kwargs)
+        self.origin = np.array(origin, dtype = float)
+        n_pendulums = len(theta_array)
+        no_lines = np.zeros((n_pendulums, 3))
+        self.lines1 = BatchedLines(no_lines, no_lines, stroke_opacity = opacity, stroke_width = 2, stroke_color = RED)
+        self.lines2 = BatchedLines(no_lines, no_lines, stroke_opacity = opacity, stroke_width = 2, stroke_color = BLUE)
+        self.masses = BatchedDots(np.zeros((2 * n_pendulums, 3)), radius = 0.03, color = WHITE, fill_opacity = opacity)
+        self.anchor = Dot(self.origin, color = WHITE, radius = 0.05)
+        self.add(self.lines1, self.lines2, self.anchor, self.masses)
+        self.set_state(theta_array)
+
+
+    # moves all pendulums to the angles of the [n_pendulums, 2] array 'theta_array'
+    def set_state(self, theta_array):
+        theta1, theta2 = theta_array[:,0], theta_array[:,1]
+        m1_coords = self.origin + L * np.column_stack((np.sin(theta1), -np.cos(theta1), np.zeros(len(theta1))))
+        m2_coords = m1_coords + L * np.column_stack((np.sin(theta2), -np.cos(theta2), np.zeros(len(theta2))))
+        self.lines1.set_lines(np.broadcast_to(self.origin, m1_coords.shape), m1_coords)
+        self.lines2.set_lines(m1_coords, m2_coords)
+        self.masses.set_positions(np.concatenate((m1_coords, m2_coords)))
+        return self
 
 
 # phase space class
@@ -69,6 +89,12 @@ class PhaseSpace(Mobject):
         self.x_inc = (max(self.x_array) - min(self.x_array)) / 10
         self.xdot_inc = (max(self.xdot_array) - min(self.xdot_array)) / 10
 
+        # axes of the phase space, built once
+        self.ax = Axes(x_range = [min(self.x_array) - self.x_inc, max(self.x_array) + self.x_inc, 1], 
+                       y_range = [min(self.xdot_array) - self.xdot_inc, max(self.xdot_array) + self.xdot_inc, 1], 
+                       x_length = self.side_length, 
+                       y_length = self.side_length).move_to(self.center)
+
         square = Square(side_length = side_length, stroke_width = stroke_width, stroke_color = WHITE, **kwargs).move_to(center)
         self.add(square)
 
@@ -82,12 +108,14 @@ class PhaseSpace(Mobject):
             self.add(x_label, xdot_label)
 
 
-    def c2p(self, x, y, z):
-        ax = Axes(x_range = [min(self.x_array) - self.x_inc, max(self.x_array) + self.x_inc, 1], 
-                  y_range = [min(self.xdot_array) - self.xdot_inc, max(self.xdot_array) + self.xdot_inc, 1], 
-                  x_length = self.side_length, 
-                  y_length = self.side_length).move_to(self.center)
-        return ax.c2p(x, y, z)
+    # method to return the position in phase space for given x and xdot
+    def c2p(self, x, y, z = 0):
+        return self.ax.c2p(x, y, z)
+
+
+    # method to return the positions in phase space for an (N, 2) array of phase points (x, xdot)
+    def c2p_array(self, phase_points):
+        return c2p_array(self.ax, phase_points)
 
 
 class double_pendulum_scene(Scene):
@@ -98,6 +126,17 @@ class double_pendulum_scene(Scene):
         # headline
         text_double_pendulum = Title(r"Double Pendulum", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT) 
 
+        # lazily opened data resampled at the frame times
+        numerical_data = Dataset("data/double_pendulum_numerical_data.csv")
+        analytical_data = Dataset("data/double_pendulum_analytical_data.csv")
+        numerical_frames = numerical_data.get_frame_resampler(config.frame_rate, run_time, speed = speed_numerical)
+        analytical_frames = analytical_data.get_frame_resampler(config.frame_rate, run_time, speed = speed_analytical)
+
+        theta1_numerical, theta1_v_numerical, theta2_numerical, theta2_v_numerical = numerical_data.resample(numerical_frames, slice(1, 5)).T
+        theta1_analytical, theta2_analytical = analytical_data.resample(analytical_frames, ["theta1", "theta2"]).T
+        timeline = ValueTracker(0)
+
+
         # coordinates of the anchor points 
         numerical_origin = np.array([-3.25, 1.5, 0])
         analytical_origin = np.array([3, 1, 0])
@@ -110,20 +149,18 @@ class double_pendulum_scene(Scene):
         numerical_anchor = Line(numerical_origin - np.array([0.5, 0, 0]), numerical_origin + np.array([0.5, 0, 0]), color = WHITE, stroke_width = 5)
         analytical_anchor = Line(analytical_origin - np.array([0.5, 0, 0]), analytical_origin + np.array([0.5, 0, 0]), color = WHITE, stroke_width = 5)
 
-        numerical_pendulum = make_double_pendulum(numerical_origin, theta1_numerical[0], theta2_numerical[0], color = RED)
-        analytical_pendulum = make_double_pendulum(analytical_origin, theta1_analytical[0], theta2_analytical[0], color = BLUE)
+        numerical_pendulum = DoublePendulum(numerical_origin, theta1_numerical[0], theta2_numerical[0])
+        analytical_pendulum = DoublePendulum(analytical_origin, theta1_analytical[0], theta2_analytical[0])
 
 
         def numerical_pendulum_updater(pendulum):
-            theta1 = next(theta1_numerical_iter)
-            theta2 = next(theta2_numerical_iter)
-            pendulum.become(make_double_pendulum(numerical_origin, theta1, theta2, RED))
+            frame = numerical_frames.get_frame(timeline.get_value())
+            pendulum.set_state(theta1_numerical[frame], theta2_numerical[frame])
 
 
         def analytical_pendulum_updater(pendulum):
-            theta1 = next(theta1_analytical_iter)
-            theta2 = next(theta2_analytical_iter)
-            pendulum.become(make_double_pendulum(analytical_origin, theta1, theta2, BLUE))
+            frame = analytical_frames.get_frame(timeline.get_value())
+            pendulum.set_state(theta1_analytical[frame], theta2_analytical[frame])
 
 
         # phase space
@@ -131,36 +168,71 @@ class double_pendulum_scene(Scene):
             side_length = 3.75, labels = (r'$\theta_1\,\big|\,\theta_2$', r'$\dot{\theta}_1\,\big|\,\dot{\theta}_2$'))
         
 
-        # points in phase space
-        theta1_dot = Dot(phase_space.c2p(theta1_numerical[0], theta1_v_numerical[0], 0), radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75)
-        theta2_dot = Dot(phase_space.c2p(theta2_numerical[0], theta2_v_numerical[0], 0), radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75)
+        # points in phase space (positions of all frames mapped at once)
+        theta1_points = phase_space.c2p_array(np.column_stack((theta1_numerical, theta1_v_numerical)))
+        theta2_points = phase_space.c2p_array(np.column_stack((theta2_numerical, theta2_v_numerical)))
+        theta1_dot = Dot(theta1_points[0], radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75)
+        theta2_dot = Dot(theta2_points[0], radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75)
+        theta1_trace = PhaseTrace(theta1_points, tail_length = phase_trace_tail, color = RED)
+        theta2_trace = PhaseTrace(theta2_points, tail_length = phase_trace_tail, color = BLUE)
 
 
         def theta1_dot_updater(dot):
-            theta1 = next(theta1_numerical_ps_iter)
-            theta1_v = next(theta1_v_numerical_ps_iter)
-            self.add(Line(start = dot.get_center(), end = phase_space.c2p(theta1, theta1_v, 0), stroke_width = 1, color = RED).set_opacity(0.75))
-            dot.become(Dot(phase_space.c2p(theta1, theta1_v, 0), radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75))
+            frame = numerical_frames.get_frame(timeline.get_value())
+            theta1_trace.set_frame(frame)
+            dot.move_to(theta1_points[frame])
 
 
         def theta2_dot_updater(dot):
-            theta2 = next(theta2_numerical_ps_iter)
-            theta2_v = next(theta2_v_numerical_ps_iter)
-            self.add(Line(start = dot.get_center(), end = phase_space.c2p(theta2, theta2_v, 0), stroke_width = 1, color = BLUE).set_opacity(0.75))
-            dot.become(Dot(phase_space.c2p(theta2, theta2_v, 0), radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75))
+            frame = numerical_frames.get_frame(timeline.get_value())
+            theta2_trace.set_frame(frame)
+            dot.move_to(theta2_points[frame])
 
 
         self.add(text_double_pendulum, numerical_anchor, phase_space)#, text_numerical, text_analytical, analytical_anchor)
-        self.add(numerical_pendulum, theta1_dot, theta2_dot)#, analytical_pendulum)
+        self.add(numerical_pendulum, theta1_trace, theta2_trace, theta1_dot, theta2_dot)#, analytical_pendulum)
         self.wait(1.5)
-        timeline = ValueTracker(0)
         numerical_pendulum.add_updater(numerical_pendulum_updater)
         #analytical_pendulum.add_updater(analytical_pendulum_updater)
         theta1_dot.add_updater(theta1_dot_updater)
         theta2_dot.add_updater(theta2_dot_updater)
-        self.play(timeline.animate.set_value(10), rate_func = linear, run_time = 25)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
         numerical_pendulum.remove_updater(numerical_pendulum_updater)
         #analytical_pendulum.remove_updater(analytical_pendulum_updater)
         theta1_dot.remove_updater(theta1_dot_updater)
         theta2_dot.remove_updater(theta2_dot_updater)
         self.wait(5)
+
+
+# ensemble of double pendulums with slightly perturbed initial angles (data layout: [frames, n_pendulums, 2])
+class double_pendulum_ensemble_scene(Scene):
+    def construct(self):
+        CVC = Text('CVC', font_size = 12, weight = BOLD, color = WHITE, font = 'Latin Modern Sans').align_on_border(RIGHT + DOWN, buff = 0.2)
+        self.add(CVC) 
+
+        # headline
+        text_double_pendulum = Title(r"Double Pendulum Ensemble", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT) 
+
+        # lazily opened data (written by 'make run_ensemble') resampled at the frame times
+        ensemble_data = Dataset("data/double_pendulum_ensemble_data.csv")
+        ensemble_frames = ensemble_data.get_frame_resampler(config.frame_rate, run_time, speed = speed_ensemble)
+        theta_ensemble = ensemble_data.resample(ensemble_frames, slice(1, None)).reshape(ensemble_frames.n_frames, -1, 2)
+        timeline = ValueTracker(0)
+
+        # pendulums
+        ensemble_origin = np.array([0, 1.5, 0])
+        ensemble_anchor = Line(ensemble_origin - np.array([0.5, 0, 0]), ensemble_origin + np.array([0.5, 0, 0]), color = WHITE, stroke_width = 5)
+        ensemble_pendulums = DoublePendulumEnsemble(ensemble_origin, theta_ensemble[0])
+        text_ensemble = Tex(f"$N={theta_ensemble.shape[1]}$", color = WHITE, font_size = 32).move_to(ensemble_origin).shift(4 * RIGHT)
+
+
+        def ensemble_updater(pendulums):
+            pendulums.set_state(theta_ensemble[ensemble_frames.get_frame(timeline.get_value())])
+
+
+        self.add(text_double_pendulum, ensemble_anchor, ensemble_pendulums, text_ensemble)
+        self.wait(1.5)
+        ensemble_pendulums.add_updater(ensemble_updater)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
+        ensemble_pendulums.remove_updater(ensemble_updater)
+        self.wait(5)
@@ -1,4 +1,8 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import c2p_array, PhaseTrace
 
 
 # global constants
@@ -6,23 +10,10 @@ A = 2
 omega = 1
 
 
-# processing data
-pendulum_data = np.loadtxt(f"data/driven_damped_pendulum_{A}_{omega}_data.csv", delimiter = ",", skiprows = 1)
-
-time = pendulum_data[:,0]
-theta = pendulum_data[:,1]
-theta_v = pendulum_data[:,2]
-
-
-# iter for pendulum and phase space
-animation_speed = 5
-
-time_iter = iter(time[::animation_speed])
-theta_iter = iter(theta[::animation_speed])
-theta_v_iter = iter(theta_v[::animation_speed])
-
-theta_ps_iter = iter(theta[::animation_speed])
-theta_v_ps_iter = iter(theta_v[::animation_speed])
+# animation parameters
+run_time = 25
+animation_speed = 3                             # simulation time per second of video
+phase_trace_tail = None                         # number of frames of the fading phase space trace (None: full trace)
 
 
 
@@ -53,15 +44,36 @@ class PhaseSpace(Mobject):
         # return phase_space_dot
         # return self.ax.c2p(x, y, 0)
         return self.pax.pr2pt(r, phi)
+
+
+    # method to return the positions in phase space for an (N, 2) array of phase points (phi, r)
+    def c2p_array(self, phase_points):
+        phi, r = np.asarray(phase_points).T
+        return c2p_array(self.pax, np.column_stack((r * np.cos(phi), r * np.sin(phi))))
     
 
 
-# driven pendulum class
-class DrivenPendulum(Mobject):
-    def __init__(self, center, radius, **kwargs):
+# driven pendulum class (pendulum and motor built once, rotated to new states by 'set_state')
+class DrivenPendulum(VGroup):
+    def __init__(self, center, radius, theta = 0, t = 0, **kwargs):
         super().__init__(**kwargs)
         self.center = center
         self.radius = radius
+        self.theta = 0
+        self.t = 0
+        self.pendulum = self.get_pendulum(0)
+        self.motor = self.get_motor(0)
+        self.add(self.pendulum, self.motor)
+        self.set_state(theta, t)
+
+
+    # method to rotate pendulum and motor from their current state to the angle 'theta' and the time 't'
+    def set_state(self, theta, t):
+        self.pendulum.rotate(about_point = self.center, angle = theta - self.theta)
+        self.motor.rotate(about_point = self.center, angle = omega * (t - self.t))
+        self.theta = theta
+        self.t = t
+        return self
 
 
     # method to rotate the pendulum according to the given angle
@@ -109,64 +121,58 @@ class driven_damped_pendulum_scene(Scene):
         self.add(text_double_pendulum)
 
 
+        # lazily opened data resampled at the frame times
+        pendulum_data = Dataset(f"data/driven_damped_pendulum_{A}_{omega}_data.csv")
+        frames = pendulum_data.get_frame_resampler(config.frame_rate, run_time, speed = animation_speed)
+        time, theta, theta_v = pendulum_data.resample(frames, ["t", "theta", "theta_v"]).T
+        timeline = ValueTracker(0)
+
+
         # parameters
         pendulum_center = np.array([-3, -0.25, 0])
         pendulum_radius = 2
-        t = next(time_iter)
-        rotated_pendulum_theta = next(theta_iter)
+        t = time[0]
+        rotated_pendulum_theta = theta[0]
 
         phase_space_center = np.array([3, -0.25, 0])
         phase_space_side_length = 3.75
-        phase_space_theta = next(theta_ps_iter) % (2*PI)
-        phase_space_theta_v = next(theta_v_ps_iter)
+        phase_space_theta = theta[0] % (2*PI)
+        phase_space_theta_v = theta_v[0]
 
 
         # pendulum
-        pendulum = DrivenPendulum(pendulum_center, pendulum_radius)
-
-        rotated_pendulum = pendulum.get_pendulum(rotated_pendulum_theta)
-        rotated_pendulum.iter = theta_iter
-        rotated_pendulum.getter = pendulum.get_pendulum
-
-        motor = pendulum.get_motor(t)
-        motor.iter = time_iter
-        motor.getter = pendulum.get_motor
-        self.add(pendulum, rotated_pendulum, motor)
+        pendulum = DrivenPendulum(pendulum_center, pendulum_radius, rotated_pendulum_theta, t)
+        self.add(pendulum)
 
         # phase space
         phase_space = PhaseSpace(center = phase_space_center, phase_array = (np.array([0, 2*PI]), theta_v), side_length = phase_space_side_length, labels = (r'$\theta$, $\dot{\theta}$ (polar)', ''))
         # phase_space_dot = phase_space.get_dot(phase_space_theta, phase_space_theta_v)
         phase_space_dot = Dot(phase_space.c2p(phase_space_theta, phase_space_theta_v), radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75)
-        phase_space_dot.pos_getter = phase_space.c2p
-        phase_space_dot.theta_iter = theta_ps_iter
-        phase_space_dot.theta_v_iter = theta_v_ps_iter
-        self.add(phase_space, phase_space_dot)
+        phase_space_dot.points_array = phase_space.c2p_array(np.column_stack((theta % (2*PI), theta_v)))    # positions of all frames mapped at once
+        phase_space_dot.trace = PhaseTrace(phase_space_dot.points_array, tail_length = phase_trace_tail, color = RED)
+        self.add(phase_space, phase_space_dot.trace, phase_space_dot)
 
 
         # pendulum updater
         def pendulum_updater(pendulum):
-            theta = next(pendulum.iter)
-            pendulum.become(pendulum.getter(theta))
+            frame = frames.get_frame(timeline.get_value())
+            pendulum.set_state(theta[frame], time[frame])
 
 
         # phase space updater
         def phase_space_updater(dot):
             # theta_old = dot.state[0]
             # theta_v_old = dot.state[1]
-            theta_new = next(dot.theta_iter) % (2*PI)
-            theta_v_new = next(dot.theta_v_iter)
             # new_dot = dot.getter(theta_new, theta_v_new)
-            new_dot_pos = dot.pos_getter(theta_new, theta_v_new)
-            self.add(Line(start = dot.get_center(), end = new_dot_pos, stroke_width = 1, color = RED).set_opacity(0.75))
-            dot.move_to(new_dot_pos)
+            frame = frames.get_frame(timeline.get_value())
+            dot.trace.set_frame(frame)
+            dot.move_to(dot.points_array[frame])
 
 
         self.wait(1.5)
-        timeline = ValueTracker(0)
 
-        rotated_pendulum.add_updater(pendulum_updater)
-        motor.add_updater(pendulum_updater)
+        pendulum.add_updater(pendulum_updater)
         phase_space_dot.add_updater(phase_space_updater)
 
-        self.play(timeline.animate.set_value(10), rate_func = linear, run_time = 25)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
         self.wait(5)
\ No newline at end of file
@@ -0,0 +1,263 @@
+import os
+import time
+import numpy as np
+
+
+# physical parameters (units of three_body_problem.c: AU, years, sun masses)
+G = 4 * np.pi**2                                                        # gravitation constant
+N = 1000                                                                # number of bodies
+cluster_mass = 1000                                                     # total mass of the cluster (equal masses)
+plummer_radius = 100                                                    # scale radius of the plummer sphere
+softening = 2                                                           # plummer softening length of the forces
+
+# integration parameters
+T_max = 60
+delta_t = 20e-3                                                         # maximum time step of the leapfrog integration
+seed = 97                                                               # seed of the initial cluster
+
+# force parameters
+direct_max_N = 5000                                                     # direct summation up to this number of bodies, barnes-hut above
+chunk_size = 2**20                                                      # maximum number of body pairs evaluated at once
+theta = 0.7                                                             # opening angle of the barnes-hut tree
+leaf_size = 8                                                           # maximum number of bodies in a leaf of the tree
+max_depth = 16                                                          # maximum depth of the tree (bits per coordinate of the morton keys)
+
+# file of the positions written by 'make run'
+positions_path = f"data/n_body_{N}_positions.npy"
+
+
+# returns the positions and velocities (dim 0: body, dim 1: coordinate) of 'N' bodies of total mass 'M' sampled from a plummer sphere of
+# scale radius 'a' (radii by inverting the cumulative mass, speeds by rejection sampling of the distribution function), at rest in the
+# center of mass frame
+def get_plummer_sphere(N = N, M = cluster_mass, a = plummer_radius, seed = seed):
+    rng = np.random.default_rng(seed)
+    def get_directions(n):
+        cos_theta = rng.uniform(-1, 1, n)
+        phi = rng.uniform(0, 2 * np.pi, n)
+        sin_theta = np.sqrt(1 - cos_theta**2)
+        return np.column_stack((sin_theta * np.cos(phi), sin_theta * np.sin(phi), cos_theta))
+
+    r = a / np.sqrt(rng.uniform(0, 1, N)**(-2/3) - 1)
+
+    # speeds q in units of the escape speed: q^2 (1 - q^2)^(7/2) below its maximum 0.1 sampled until every body has one
+    q = np.empty(0)
+    while len(q) < N:
+        q_trial = rng.uniform(0, 1, 2 * N)
+        q = np.concatenate((q, q_trial[rng.uniform(0, 0.1, 2 * N) < q_trial**2 * (1 - q_trial**2)**3.5]))
+    v = q[:N] * np.sqrt(2 * G * M / a) * (1 + r**2 / a**2)**(-1/4)
+
+    positions = r[:,np.newaxis] * get_directions(N)
+    velocities = v[:,np.newaxis] * get_directions(N)
+    return positions - np.mean(positions, axis = 0), velocities - np.mean(velocities, axis = 0)
+
+
+# returns the inverse softened distances 1 / sqrt(r^2 + softening^2) (dim 0: body of the block starting at 'start', dim 1: body) of the
+# bodies of the block to all bodies at 'positions' (squared distances |r_i|^2 + |r_j|^2 - 2 r_i r_j from one matrix product)
+def get_inverse_distances(positions, start, block_size, softening = softening):
+    squares = np.sum(positions**2, axis = -1)
+    block = slice(start, start + block_size)
+    r2 = squares[block,np.newaxis] + squares[np.newaxis,:] - 2 * positions[block] @ positions.T
+    return 1 / np.sqrt(np.maximum(r2, 0) + softening**2)
+
+
+# gravitational accelerations of the bodies at 'positions' (dim 0: body, dim 1: coordinate) by all other bodies of the 'masses' summed
+# directly over all pairs, a_i = G sum_j m_j (r_j - r_i) / (r_ij^2 + softening^2)^(3/2) as matrix products over blocks of bodies of at
+# most 'chunk_size' pairs
+def get_accelerations_direct(positions, masses, softening = softening):
+    accelerations = np.empty_like(positions)
+    block_size = max(1, chunk_size // len(positions))
+    for start in range(0, len(positions), block_size):
+        weights = masses * get_inverse_distances(positions, start, block_size, softening)**3
+        accelerations[start:start+block_size] = weights @ positions - np.sum(weights, axis = -1)[:,np.newaxis] * positions[start:start+block_size]
+    return G * accelerations
+
+
+# (positive) potential energy of the bodies at 'positions' with the 'masses': G m_i m_j / sqrt(r^2 + softening^2) for every pair
+def get_potential_energy_direct(positions, masses, softening = softening):
+    potential_energy = 0
+    block_size = max(1, chunk_size // len(positions))
+    for start in range(0, len(positions), block_size):
+        inverse_r = get_inverse_distances(positions, start, block_size, softening)
+        inverse_r[np.arange(len(inverse_r)), start + np.arange(len(inverse_r))] = 0                 # no self energy
+        potential_energy += G * masses[start:start+block_size] @ inverse_r @ masses / 2
+    return potential_energy
+
+
+# returns the index arrays of all elements of the index ranges 'starts' to 'ends' (exclusive) and the number of the range of every element
+def expand_ranges(starts, ends):
+    counts = ends - starts
+    range_i = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return starts[range_i] + offsets, range_i
+
+
+# barnes-hut octree of the bodies at 'positions' with the 'masses': the bodies are sorted along their morton keys (of 'max_depth' bits
+# per coordinate), so that every node of the tree holds a contiguous range of bodies; the tree is built level by level as flat arrays
+# (range of bodies, mass, center of mass, side length, range of child nodes) and walked for whole leaves of bodies at once
+class BarnesHutTree:
+    def __init__(self, positions, masses, leaf_size = leaf_size, max_depth = max_depth):
+        lower = np.min(positions, axis = 0)
+        self.root_size = max(np.max(np.max(positions, axis = 0) - lower), 1e-10) * (1 + 1e-9)
+        cells = ((positions - lower) / self.root_size * 2**max_depth).astype(np.int64)
+        keys = np.zeros(len(positions), dtype = np.int64)
+        for bit in range(max_depth):
+            for axis in range(3):
+                keys |= ((cells[:,axis] >> bit) & 1) << (3 * bit + 2 - axis)
+        self.order = np.argsort(keys, kind = "stable")
+        keys = keys[self.order]
+        self.positions = positions[self.order]
+        self.masses = masses[self.order]
+
+        # levels of the tree: nodes are the runs of equal key prefixes inside the nodes split on the level above
+        starts_list, ends_list, level_list = [], [], []
+        split = np.ones(len(keys), dtype = bool)                        # bodies in a node to be split on the current level
+        for level in range(max_depth + 1):
+            prefixes = keys >> 3 * (max_depth - level)
+            run_starts = np.concatenate(([0], np.flatnonzero(np.diff(prefixes)) + 1))
+            run_ends = np.append(run_starts[1:], len(keys))
+            new = split[run_starts]
+            starts, ends = run_starts[new], run_ends[new]
+            if len(starts) == 0:
+                break
+            starts_list.append(starts)
+            ends_list.append(ends)
+            level_list.append(np.full(len(starts), level))
+            is_split = (ends - starts > leaf_size) & (level < max_depth)
+            split = np.repeat(np.isin(run_starts, starts[is_split]), run_ends - run_starts)
+        self.starts = np.concatenate(starts_list)
+        self.ends = np.concatenate(ends_list)
+        self.size = self.root_size / 2.0**np.concatenate(level_list)
+
+        # child nodes: the nodes of the next level inside the range of bodies of the node (none for the leaves)
+        level_offsets = np.cumsum([0] + [len(starts) for starts in starts_list])
+        self.child_starts = np.zeros(len(self.starts), dtype = int)
+        self.child_ends = np.zeros(len(self.starts), dtype = int)
+        for level in range(len(starts_list) - 1):
+            nodes = slice(level_offsets[level], level_offsets[level + 1])
+            self.child_starts[nodes] = level_offsets[level + 1] + np.searchsorted(starts_list[level + 1], starts_list[level])
+            self.child_ends[nodes] = level_offsets[level + 1] + np.searchsorted(starts_list[level + 1], ends_list[level])
+        self.is_leaf = self.child_starts == self.child_ends
+
+        # masses and centers of mass of the nodes from the cumulative sums over the sorted bodies
+        cumulative_mass = np.concatenate(([0], np.cumsum(self.masses)))
+        cumulative_moment = np.concatenate((np.zeros((1, 3)), np.cumsum(self.masses[:,np.newaxis] * self.positions, axis = 0)))
+        self.mass = cumulative_mass[self.ends] - cumulative_mass[self.starts]
+        self.com = (cumulative_moment[self.ends] - cumulative_moment[self.starts]) / self.mass[:,np.newaxis]
+
+        # leaves in the order of their bodies and the radii of the leaves around their centers of mass
+        self.leaves = np.flatnonzero(self.is_leaf)
+        self.leaves = self.leaves[np.argsort(self.starts[self.leaves])]
+        leaf_counts = self.ends[self.leaves] - self.starts[self.leaves]
+        distances = np.linalg.norm(self.positions - np.repeat(self.com[self.leaves], leaf_counts, axis = 0), axis = -1)
+        self.radius = np.zeros(len(self.starts))
+        self.radius[self.leaves] = np.maximum.reduceat(distances, self.starts[self.leaves])
+
+
+    # accelerations of the (sorted) bodies of the consecutive 'leaves' walking down the tree from the root: nodes seen from a whole leaf
+    # under an angle size / distance below 'theta' act on its bodies as point masses at their center of mass, the bodies of opened leaves
+    # are summed directly, other opened nodes pass on to their children; all (leaf, node) pairs of one level of the walk are evaluated at once
+    def get_leaf_accelerations(self, leaves, theta = theta, softening = softening):
+        first_body = self.starts[leaves[0]]
+        accelerations = np.zeros((self.ends[leaves[-1]] - first_body, 3))
+        leaf_i = leaves
+        node_i = np.zeros(len(leaves), dtype = int)
+        while len(leaf_i):
+            delta = self.com[node_i] - self.com[leaf_i]
+            distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+            far = self.size[node_i] < theta * (distance - self.radius[leaf_i])
+            near_leaf = ~far & self.is_leaf[node_i]
+
+            # far nodes as point masses for every body of the leaf, the bodies of near leaves for every body of the leaf (the body itself
+            # included: no force at distance 0)
+            far_body_i, pair_i = expand_ranges(self.starts[leaf_i[far]], self.ends[leaf_i[far]])
+            far_node_i = node_i[far][pair_i]
+            near_body_i, pair_i = expand_ranges(self.starts[leaf_i[near_leaf]], self.ends[leaf_i[near_leaf]])
+            other_i, other_pair_i = expand_ranges(self.starts[node_i[near_leaf]][pair_i], self.ends[node_i[near_leaf]][pair_i])
+            body_i = np.concatenate((far_body_i, near_body_i[other_pair_i]))
+            pair_delta = np.concatenate((self.com[far_node_i], self.positions[other_i])) - self.positions[body_i]
+            weights = np.concatenate((self.mass[far_node_i], self.masses[other_i])) * (np.einsum("ij,ij->i", pair_delta, pair_delta) + softening**2)**(-1.5)
+            for axis in range(3):
+                accelerations[:,axis] += np.bincount(body_i - first_body, weights = weights * pair_delta[:,axis], minlength = len(accelerations))
+
+            # near nodes opened to their children
+            opened = ~far & ~self.is_leaf[node_i]
+            node_i, pair_i = expand_ranges(self.child_starts[node_i[opened]], self.child_ends[node_i[opened]])
+            leaf_i = leaf_i[opened][pair_i]
+        return G * accelerations
+
+
+    # accelerations of all bodies (in the order of the positions the tree was built from), walked in blocks of neighboring leaves
+    def get_accelerations(self, theta = theta, softening = softening):
+        accelerations = np.empty((len(self.positions), 3))
+        block_size = max(1, chunk_size // 4096)
+        for start in range(0, len(self.leaves), block_size):
+            leaves = self.leaves[start:start+block_size]
+            accelerations[self.order[self.starts[leaves[0]]:self.ends[leaves[-1]]]] = self.get_leaf_accelerations(leaves, theta, softening)
+        return accelerations
+
+
+# gravitational accelerations of the bodies at 'positions' (dim 0: body, dim 1: coordinate) with the 'masses': direct summation for up
+# to 'direct_max_N' bodies, a barnes-hut tree for larger clusters
+def get_accelerations(positions, masses):
+    if len(positions) <= direct_max_N:
+        return get_accelerations_direct(positions, masses)
+    return BarnesHutTree(positions, masses).get_accelerations()
+
+
+# total energy of the bodies at 'positions' with the 'velocities' and the 'masses'
+def get_energy(positions, velocities, masses):
+    return np.sum(masses / 2 * np.sum(velocities**2, axis = -1)) - get_potential_energy_direct(positions, masses)
+
+
+# returns the positions of the plummer cluster of 'N' bodies at the equidistant times 't_frames' (dim 0: frame, dim 1: body, dim 2:
+# coordinate) and the relative energy drift |E/E_0 - 1| at the last frame, integrated with leapfrog (kick-drift-kick) steps of at most
+# 'delta_t' fitted into the frames, the accelerations carried over from one step to the next (one evaluation of the forces per step)
+def get_n_body_positions(t_frames, N = N, delta_t = delta_t):
+    positions, velocities = get_plummer_sphere(N)
+    masses = np.full(N, cluster_mass / N)
+    frame_delta_t = t_frames[1] - t_frames[0]
+    n_substeps = int(np.ceil(frame_delta_t / delta_t))
+    h = frame_delta_t / n_substeps
+    energy_start = get_energy(positions, velocities, masses)
+
+    positions_array = np.empty((len(t_frames), N, 3))
+    positions_array[0] = positions
+    accelerations = get_accelerations(positions, masses)
+    for frame_i in range(1, len(t_frames)):
+        for _ in range(n_substeps):
+            velocities += accelerations * h / 2
+            positions += velocities * h
+            accelerations = get_accelerations(positions, masses)
+            velocities += accelerations * h / 2
+        positions_array[frame_i] = positions
+    return positions_array, abs(get_energy(positions, velocities, masses) / energy_start - 1)
+
+
+# force kernels against each other (run time per evaluation, deviation of the tree from the direct sum) and the positions of the
+# cluster at the frames of the animation written to 'positions_path'
+if __name__ == "__main__":
+    framerate = 60
+    run_time = 30
+
+    for n_bodies in (100, 1000, 10000, 100000):
+        positions, velocities = get_plummer_sphere(n_bodies)
+        masses = np.full(n_bodies, cluster_mass / n_bodies)
+        start_time = time.perf_counter()
+        tree = BarnesHutTree(positions, masses)
+        tree_accelerations = tree.get_accelerations()
+        tree_time = time.perf_counter() - start_time
+        print(f"{n_bodies} bodies: barnes-hut (theta={theta}) {tree_time:.3f} s", end = "")
+        if n_bodies <= 10000:
+            start_time = time.perf_counter()
+            direct_accelerations = get_accelerations_direct(positions, masses)
+            direct_time = time.perf_counter() - start_time
+            error = np.linalg.norm(tree_accelerations - direct_accelerations, axis = -1) / np.linalg.norm(direct_accelerations, axis = -1)
+            print(f", direct {direct_time:.3f} s, rel. deviation median {np.median(error):.2g}, max. {np.max(error):.2g}", end = "")
+        print()
+
+    t_frames = np.linspace(0, T_max, run_time * framerate + 1)
+    start_time = time.perf_counter()
+    positions, energy_drift = get_n_body_positions(t_frames)
+    print(f"{N} bodies up to t={T_max}: {time.perf_counter() - start_time:.3f} s, rel. energy drift {energy_drift:.3g}")
+    os.makedirs("data", exist_ok = True)
+    np.save(positions_path, positions)
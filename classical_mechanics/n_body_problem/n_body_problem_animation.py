@@ -0,0 +1,82 @@
+from manim import *
+import os
+import sys
+sys.path.append("../..")
+from cvc_data import FrameResampler
+from cvc_mobjects import BatchedDots, PointCloud
+from n_body_problem import N, T_max, plummer_radius, positions_path, get_n_body_positions
+
+
+# provide paramters
+run_time = 30
+simulation_speed = T_max / run_time             # simulation time per second of video
+scene_scale = 2.5 / plummer_radius              # scene units per AU
+body_radius = 0.015
+
+# source of the data ("python": integrated by n_body_problem.py at the frame times, "npy": the positions written by 'make run' at its
+# own frame times)
+data_source = "npy"
+
+
+# returns the frame resampler and the scene positions of the N bodies at every frame (dim 0: frame, dim 1: body, dim 2: coordinate)
+def get_frames_and_positions():
+    if data_source == "npy" and os.path.exists(positions_path):
+        positions = np.load(positions_path)
+        t_frames = np.linspace(0, T_max, len(positions))
+    else:
+        t_frames = simulation_speed * np.arange(int(round(run_time * config.frame_rate)) + 1) / config.frame_rate
+        positions = get_n_body_positions(t_frames)[0]
+    frames = FrameResampler(t_frames, config.frame_rate, run_time, speed = simulation_speed)
+    return frames, scene_scale * positions
+
+
+# main 2D animation: the cluster projected onto the xy-plane
+class n_body_problem_scene(Scene):
+    def construct(self):
+        timeline = ValueTracker(0)
+        CVC = Text('CVC', font_size = 12, weight = BOLD, color = WHITE, font = 'Latin Modern Sans').align_on_border(RIGHT + DOWN, buff = 0.2)
+        self.add(CVC)
+
+        # headline
+        text_NBP = Title(f"The {N}-Body-Problem", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT)
+
+        # positions of the bodies at the frame times, all bodies drawn as one mobject
+        frames, positions = get_frames_and_positions()
+        positions[...,2] = 0
+        bodies = BatchedDots(positions[0], radius = body_radius, color = YELLOW, fill_opacity = 0.75)
+
+        # updater of the body positions
+        def bodies_updater(bodies):
+            bodies.set_positions(positions[frames.get_frame(timeline.get_value())])
+
+        self.add(bodies, text_NBP)
+        self.wait(1.5)
+
+        # timeline as ValueTracker
+        bodies.add_updater(bodies_updater)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
+        bodies.remove_updater(bodies_updater)
+        self.wait(5)
+
+
+# 3D animation: the cluster as a point cloud under a rotating camera
+class NBP_main_3D(ThreeDScene):
+    def construct(self):
+        timeline = ValueTracker(0)
+        self.set_camera_orientation(phi = 75*DEGREES, theta = -45*DEGREES)
+        axes = ThreeDAxes()
+
+        # positions of the bodies at the frame times
+        frames, positions = get_frames_and_positions()
+        bodies = PointCloud(positions[0], color = YELLOW, stroke_width = 3, opacity = 0.75)
+
+        # updater of the body positions
+        def bodies_updater(bodies):
+            bodies.set_positions(positions[frames.get_frame(timeline.get_value())])
+
+        self.add(axes, bodies)
+        self.begin_ambient_camera_rotation(rate = 0.15)
+
+        # timeline as ValueTracker
+        bodies.add_updater(bodies_updater)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
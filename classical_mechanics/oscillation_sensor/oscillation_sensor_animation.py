@@ -1,19 +1,12 @@
 from manim import *
-from numpy import linalg as npl
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import Spring, BatchedArrows
 
 
-# processing data
-oscillation_sensor_data = np.loadtxt("data/oscillation_sensor.csv", delimiter = ",", skiprows = 1)
-
-x1_array = 5 * oscillation_sensor_data[::10,1]
-y1_array = 5 * oscillation_sensor_data[::10,2] / 4
-
-x1_iter = iter(x1_array)
-y1_iter = iter(y1_array)
-x1_A_iter = iter(x1_array)
-y1_A_iter = iter(y1_array)
-x1_B_iter = iter(x1_array)
-y1_B_iter = iter(y1_array)
+# animation speed (every 'animation_speed'-th row is rendered)
+animation_speed = 10
 
 
 # force field
@@ -22,51 +15,46 @@ x1 = 5              # x-position anchor 2
 r0 = 5              # rest length of both springs
 k = 0.1             # spring constant
 smoothing_factor = 1e-10
+field_step = 1      # grid spacing of the arrows (smaller: denser field)
 
+# field coordinates (x, y) per grid coordinate of the arrows
+field_rescaling = np.array([1/2, 4/2])
 
-# spring model
-def Spring(start = UP, end = DOWN, tip_buff = 0.25, nodes = 20, k = 0.5, color = WHITE):
-    spring_group = VGroup()
-    start[2], end[2] = 0, 0
-
-    # extended parameters
-    direction = (end - start) / npl.norm(end - start)
-    anti_direction = np.array([direction[1], -direction[0], direction[2]])
-    eff_start = start + tip_buff*direction
-    eff_end = end - tip_buff*direction
-    eff_length = npl.norm(eff_end - eff_start)
-    node_length = eff_length / nodes
-    node_deviance = k
-
-    # add line with given start 'l_start' and endpoint 'l_end'
-    def spring_add_line(l_start, l_end):
-        spring_group.add(Line(l_start, l_end, color = color, stroke_width = 4, stroke_opacity = 0.5))
-    
-    # adding point with given 'pos'
-    def spring_add_dot(d_pos):
-        spring_group.add(Dot(d_pos, color = color, radius = 0.02))
-
-    # objects
-    spring_add_line(start, eff_start)               # start linie
-    spring_add_line(eff_end, end)                   # end line
-    spring_add_dot(eff_start)                       # start dot
-    spring_add_dot(eff_end)                         # end dot
-    spring_add_line(eff_start, eff_start + direction * node_length / 2 + anti_direction * node_deviance / 2)                                # first line
-    spring_add_dot(eff_start + direction * node_length / 2 + anti_direction * node_deviance / 2)                                            # first dot
-    spring_add_line(eff_start + direction * (nodes - 1/2) * node_length + (-1)**(nodes+1) * anti_direction * node_deviance / 2, eff_end)    # last line
-    for i in range(1, nodes):
-        spring_add_line(eff_start + direction * (i - 1/2) * node_length + (-1)**(i+1) * anti_direction * node_deviance / 2, eff_start + direction * (i + 1/2) * node_length + (-1)**(i) * anti_direction * node_deviance / 2)
-        spring_add_dot(eff_start + direction * (i + 1/2) * node_length + (-1)**(i) * anti_direction * node_deviance / 2)
-    return spring_group
 
+# force field: forces (N, 3) of both springs at all arrow positions 'positions' (N, 3) in one call
+def get_force_field(positions, x0 = x0, x1 = x1):
+    pos = np.asarray(positions, dtype = float)[:,:2] * field_rescaling
+    force = np.zeros((len(pos), 3))
+    for x_anchor in (x0, x1):
+        delta = pos - np.array([x_anchor, 0])
+        r = np.sqrt(np.sum(delta**2, axis = 1, keepdims = True))
+        force[:,:2] += -k * (r - r0) / (r + smoothing_factor) * delta
+    return force
+
+
+# arrows of the force field on the grid 'x_range' x 'y_range' (scaled by 'scale_factor' into the scene), all forces evaluated in one call
+# and all arrows moved in place when the anchors move
+class ForceField(BatchedArrows):
+    def __init__(self, x_range, y_range, scale_factor = 0.5, length_func = lambda norm: norm, **kwargs):
+        x_grid, y_grid = np.meshgrid(np.arange(x_range[0], x_range[1] + x_range[2]/2, x_range[2]), np.arange(y_range[0], y_range[1] + y_range[2]/2, y_range[2]))
+        self.grid_points = np.column_stack((x_grid.ravel(), y_grid.ravel(), np.zeros(x_grid.size)))
+        self.scale_factor = scale_factor
+        self.length_func = length_func
+        super().__init__(*self.get_arrows(x0, x1), max_tip_length = scale_factor * DEFAULT_ARROW_TIP_LENGTH, **kwargs)
 
-# force field
-def F(pos):
-    pos = pos / 2 
-    pos[1] = pos[1] * 4
-    force_left = -k * ( (np.sqrt((pos[0]-x0)**2 + pos[1]**2) - r0) / (np.sqrt((pos[0]-x0)**2 + pos[1]**2) + smoothing_factor) ) * ((pos[0]-x0) * RIGHT + pos[1] * UP )
-    force_right = -k * ( (np.sqrt((pos[0]-x1)**2 + pos[1]**2) - r0) / (np.sqrt((pos[0]-x1)**2 + pos[1]**2) + smoothing_factor) ) * ((pos[0]-x1) * RIGHT + pos[1] * UP )
-    return force_left + force_right
+
+    # returns the starts and ends of all arrows for the anchors at 'x0' and 'x1'
+    def get_arrows(self, x0, x1):
+        forces = get_force_field(self.grid_points, x0, x1)
+        norms = np.linalg.norm(forces, axis = 1, keepdims = True)
+        forces = np.divide(forces * self.length_func(norms), norms, out = np.zeros_like(forces), where = norms > 0)
+        starts = self.scale_factor * self.grid_points
+        return starts, starts + self.scale_factor * forces
+
+
+    # moves the anchors of the springs to 'x0' and 'x1'
+    def set_anchors(self, x0, x1):
+        return self.set_arrows(*self.get_arrows(x0, x1))
 
 
 class oscillation_sensor_scene(Scene):
@@ -80,9 +68,19 @@ class oscillation_sensor_scene(Scene):
         eq_field = Tex(
             r"$\Vec{F}=-k\left(1-\frac{r_0}{\sqrt{(x-x_1)^2+y^2}}\right)\begin{bmatrix} x-x_1 \\ y \end{bmatrix}-k\left(1-\frac{r_0}{\sqrt{(x-x_2)^2+y^2}}\right)\begin{bmatrix} x-x_2 \\ y \end{bmatrix}$", 
             color = WHITE, font_size = 32).align_on_border(DOWN + LEFT, buff = 0.5).shift(1.5 * RIGHT)  
-        avf = ArrowVectorField(
-            F, x_range = [-10, 10, 1], y_range = [-4, 4, 1], length_func = lambda x: 1*x, 
-            colors = [WHITE], opacity = 0.375, vector_config = {'stroke_width': 2}).scale(0.5)
+        avf = ForceField(x_range = [-10, 10, field_step], y_range = [-4, 4, field_step], length_func = lambda x: 1*x, color = WHITE, opacity = 0.375, stroke_width = 2)
+
+        # lazily opened data with every 'animation_speed'-th row (rescaled to the scene)
+        oscillation_sensor_data = Dataset("data/oscillation_sensor.csv", stride = animation_speed)
+        x1_array = 5 * oscillation_sensor_data.column(1)
+        y1_array = 5 * oscillation_sensor_data.column(2) / 4
+
+        x1_iter = iter(x1_array)
+        y1_iter = iter(y1_array)
+        x1_A_iter = iter(x1_array)
+        y1_A_iter = iter(y1_array)
+        x1_B_iter = iter(x1_array)
+        y1_B_iter = iter(y1_array)
 
         # spring parameters
         spring_nodes = 20
@@ -110,13 +108,13 @@ class oscillation_sensor_scene(Scene):
         def spring_A_updater(spring):
             x_mass = next(x1_A_iter)
             y_mass = next(y1_A_iter)
-            connec_A.become(Spring(start = np.array([-5, 0, 0]), end = np.array([x_mass, y_mass, 0]), k = spring_k, tip_buff = spring_tip_buff, nodes = spring_nodes))
+            connec_A.put_start_and_end_on(np.array([-5, 0, 0]), np.array([x_mass, y_mass, 0]))
 
         # spring B updater
         def spring_B_updater(spring):
             x_mass = next(x1_B_iter)
             y_mass = next(y1_B_iter)
-            connec_B.become(Spring(start = np.array([5, 0, 0]), end = np.array([x_mass, y_mass, 0]), k = spring_k, tip_buff = spring_tip_buff, nodes = spring_nodes))
+            connec_B.put_start_and_end_on(np.array([5, 0, 0]), np.array([x_mass, y_mass, 0]))
 
 
         self.add(text_oszi, line_A, line_B, A, B, mass1, connec_A, connec_B)#, eq_field, avf)
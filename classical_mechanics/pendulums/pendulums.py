@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import subprocess
+import numpy as np
+sys.path.append("../..")
+from cvc_numerics import euler_step, rk2_step, rk4_step, verlet_step, integrate
+
+
+# physical parameters (same as in pendulums.c)
+N = 10                                                                  # number of pendulums
+k = 200                                                                 # spring constant
+base_length = 1                                                         # base length of each spring
+mass = 1                                                                # mass of each pendulum
+
+# simulation parameters
+T_max = 20.0
+delta_t = 1e-3                                                          # time step
+
+# integration steps of the four integrators
+steps = {"euler": euler_step, "rk2": rk2_step, "rk4": rk4_step, "verlet": verlet_step}
+
+
+# ODE of the chains of pendulums in the state array y (dim 0: chain, dim 1: N positions and N velocities)
+def pendulums_ODE(t, y, params = None):
+    x = y[:,:N]
+    f = np.empty_like(y)
+    f[:,:N] = y[:,N:]                                                   # velocities
+    spring_force = k * (np.diff(x, axis = 1) - base_length) / mass      # force of the spring between pendulum i and i+1
+    f[:,N:] = 0
+    f[:,N] -= k * x[:,0] / mass                                         # position 0 held by the wall
+    f[:,N:2*N-1] += spring_force
+    f[:,N+1:] -= spring_force
+    return f
+
+
+# total energy of the chains of pendulums in the state array y
+def pendulums_energy(y):
+    x = y[...,:N]
+    E_kin = mass / 2 * np.sum(y[...,N:]**2, axis = -1)
+    E_pot = k / 2 * x[...,0]**2 + k / 2 * np.sum((np.diff(x, axis = -1) - base_length)**2, axis = -1)
+    return E_kin + E_pot
+
+
+# returns the initial state of 'n_chains' chains: pendulum i at position i, all at rest but the first one with velocity 20
+def get_initial_state(n_chains = 1):
+    y0 = np.zeros((n_chains, 2*N))
+    y0[:,:N] = np.arange(N)
+    y0[:,N] = 20
+    return y0
+
+
+# returns the data of pendulums_<method>_data.csv in memory: time and positions of the pendulums (every 'stride'-th time step)
+def get_pendulums_data(method, stride = 1):
+    t_array, y_array = integrate(steps[method], pendulums_ODE, get_initial_state(), 0, T_max, delta_t, stride = stride)
+    return np.column_stack((t_array, y_array[:,0,:N]))
+
+
+# accuracy and throughput of the python integrators against the C integrators of pendulums.c (run 'make' first)
+if __name__ == "__main__":
+    n_chains = 1000
+
+    # C: run time of the whole program (all four integrators, including the writing of the csv files)
+    if os.path.exists("pendulums"):
+        start_time = time.perf_counter()
+        subprocess.run(["./pendulums"], check = True)
+        print(f"C, all integrators, 1 chain: {time.perf_counter() - start_time:.3f} s")
+
+    for method, step in steps.items():
+        # accuracy: positions against the C output (written with 6 significant digits)
+        data = get_pendulums_data(method)
+        csv_path = f"data/pendulums_{method}_data.csv"
+        if os.path.exists(csv_path):
+            c_data = np.loadtxt(csv_path, delimiter = ",", skiprows = 1)
+            n_rows = min(len(data), len(c_data))
+            print(f"{method}: max. deviation from C: {np.max(np.abs(data[:n_rows,1:] - c_data[:n_rows,1:])):.3g}")
+
+        # throughput: one chain and 'n_chains' chains advanced together
+        for n in (1, n_chains):
+            start_time = time.perf_counter()
+            t_array, y_array = integrate(step, pendulums_ODE, get_initial_state(n), 0, T_max, delta_t, stride = 100)
+            run_time = time.perf_counter() - start_time
+            energy_drift = np.max(np.abs(pendulums_energy(y_array[-1]) / pendulums_energy(y_array[0]) - 1))
+            print(f"{method}, {n} chains: {run_time:.3f} s ({n * (len(t_array) - 1) * 100 / run_time:.3g} chain steps / s), rel. energy drift {energy_drift:.3g}")
@@ -1,48 +1,16 @@
 from manim import *
-from numpy import linalg as npl
-
-
-# processing data
-euler_data = np.loadtxt("data/pendulums_euler_data.csv", delimiter = ",", skiprows = 1)
-rk2_data = np.loadtxt("data/pendulums_rk2_data.csv", delimiter = ",", skiprows = 1)
-rk4_data = np.loadtxt("data/pendulums_rk4_data.csv", delimiter = ",", skiprows = 1)
-verlet_data = np.loadtxt("data/pendulums_verlet_data.csv", delimiter = ",", skiprows = 1)
-
-
-# spring model
-def Spring(start = UP, end = DOWN, tip_buff = 0.25, nodes = 20, k = 0.5, color = WHITE, stroke_width = 4):
-    spring_group = VGroup()
-    start[2], end[2] = 0, 0
-
-    # extended parameters
-    direction = (end - start) / npl.norm(end - start)
-    anti_direction = np.array([direction[1], -direction[0], direction[2]])
-    eff_start = start + tip_buff*direction
-    eff_end = end - tip_buff*direction
-    eff_length = npl.norm(eff_end - eff_start)
-    node_length = eff_length / nodes
-    node_deviance = k
-
-    # add line with given start 'l_start' and endpoint 'l_end'
-    def spring_add_line(l_start, l_end):
-        spring_group.add(Line(l_start, l_end, color = color, stroke_width = stroke_width, stroke_opacity = 0.5))
-    
-    # adding point with given 'pos'
-    def spring_add_dot(d_pos):
-        spring_group.add(Dot(d_pos, color = color, radius = 0.02))
-
-    # objects
-    spring_add_line(start, eff_start)               # start linie
-    spring_add_line(eff_end, end)                   # end line
-    spring_add_dot(eff_start)                       # start dot
-    spring_add_dot(eff_end)                         # end dot
-    spring_add_line(eff_start, eff_start + direction * node_length / 2 + anti_direction * node_deviance / 2)                                # first line
-    spring_add_dot(eff_start + direction * node_length / 2 + anti_direction * node_deviance / 2)                                            # first dot
-    spring_add_line(eff_start + direction * (nodes - 1/2) * node_length + (-1)**(nodes+1) * anti_direction * node_deviance / 2, eff_end)    # last line
-    for i in range(1, nodes):
-        spring_add_line(eff_start + direction * (i - 1/2) * node_length + (-1)**(i+1) * anti_direction * node_deviance / 2, eff_start + direction * (i + 1/2) * node_length + (-1)**(i) * anti_direction * node_deviance / 2)
-        spring_add_dot(eff_start + direction * (i + 1/2) * node_length + (-1)**(i) * anti_direction * node_deviance / 2)
-    return spring_group
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import Spring
+from pendulums import get_pendulums_data
+
+
+# animation speed (every 'animation_speed'-th row is rendered)
+animation_speed = 5
+
+# source of the data ("python": integrated in memory by pendulums.py, "csv": the files written by pendulums.c)
+data_source = "python"
 
 
 class pendulums_scene(Scene):
@@ -53,6 +21,18 @@ class pendulums_scene(Scene):
         # headline and vectorfeld
         text_pendulums = Title(r"Coupled Spring-Mass System", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT) 
 
+        # data of the four integrators with every 'animation_speed'-th row (integrated in memory or lazily opened)
+        if data_source == "python":
+            euler_data = get_pendulums_data("euler", stride = animation_speed)
+            rk2_data = get_pendulums_data("rk2", stride = animation_speed)
+            rk4_data = get_pendulums_data("rk4", stride = animation_speed)
+            verlet_data = get_pendulums_data("verlet", stride = animation_speed)
+        else:
+            euler_data = Dataset("data/pendulums_euler_data.csv", stride = animation_speed)
+            rk2_data = Dataset("data/pendulums_rk2_data.csv", stride = animation_speed)
+            rk4_data = Dataset("data/pendulums_rk4_data.csv", stride = animation_speed)
+            verlet_data = Dataset("data/pendulums_verlet_data.csv", stride = animation_speed)
+
         x_line = -5.5
         y_sep = 0.8
 
@@ -67,14 +47,26 @@ class pendulums_scene(Scene):
         text_rk4 = Tex(r'(c) Runge-Kutta 4:', font_size = 32, color = BLUE).align_on_border(LEFT, buff = 0.75).shift((y_rk4+y_sep) * UP)
         text_verlet = Tex(r'(d) Verlet:', font_size = 32, color = BLUE).align_on_border(LEFT, buff = 0.75).shift((y_verlet+y_sep) * UP)
 
-        # create spring
+        # create chain of masses coupled by springs (built once, moved by 'set_ccs')
         def ccs(x_pos_array, y_pos):
             spring_group = VGroup()
-            spring_group.add(Dot([x_line + x_pos_array[0], y_pos, 0], color = BLUE, radius = 0.1))
+            spring_group.y = y_pos
+            spring_group.masses = [Dot([x_line + x_pos_array[0], y_pos, 0], color = BLUE, radius = 0.1)]
+            spring_group.springs = []
+            spring_group.add(spring_group.masses[0])
             for i_pos in range(1, len(x_pos_array)):
-                spring_group.add(Dot([x_line + x_pos_array[i_pos], y_pos, 0], color = BLUE, radius = 0.1))
-                spring_group.add(Spring(np.array([x_line + x_pos_array[i_pos], y_pos, 0]), np.array([x_line + x_pos_array[i_pos-1], y_pos, 0]), nodes = 7, tip_buff = 0.1, k = 0.2, stroke_width = 3))
+                spring_group.masses.append(Dot([x_line + x_pos_array[i_pos], y_pos, 0], color = BLUE, radius = 0.1))
+                spring_group.springs.append(Spring(np.array([x_line + x_pos_array[i_pos], y_pos, 0]), np.array([x_line + x_pos_array[i_pos-1], y_pos, 0]), nodes = 7, tip_buff = 0.1, k = 0.2, stroke_width = 3))
+                spring_group.add(spring_group.masses[-1], spring_group.springs[-1])
             return spring_group
+
+        # move the masses and springs of a chain to the positions 'x_pos_array'
+        def set_ccs(spring_group, x_pos_array):
+            pos_array = np.column_stack((x_line + x_pos_array, np.full(len(x_pos_array), spring_group.y), np.zeros(len(x_pos_array))))
+            for mass, pos in zip(spring_group.masses, pos_array):
+                mass.move_to(pos)
+            for i_pos, spring in enumerate(spring_group.springs, start = 1):
+                spring.put_start_and_end_on(pos_array[i_pos], pos_array[i_pos-1])
         
         
         # add text, descriptions
@@ -88,21 +80,16 @@ class pendulums_scene(Scene):
         spring_verlet = ccs(verlet_data[0,1:], y_verlet+0.25)
         self.add(spring_euler, spring_rk2, spring_rk4, spring_verlet)
 
-        spring_euler.iter = iter(euler_data[::5,1:])
-        spring_rk2.iter = iter(rk2_data[::5,1:])
-        spring_rk4.iter = iter(rk4_data[::5,1:])
-        spring_verlet.iter = iter(verlet_data[::5,1:])
-
-        spring_euler.y = y_euler+0.25
-        spring_rk2.y = y_rk2+0.25
-        spring_rk4.y = y_rk4+0.25
-        spring_verlet.y = y_verlet+0.25
+        spring_euler.iter = iter(euler_data[:,1:])
+        spring_rk2.iter = iter(rk2_data[:,1:])
+        spring_rk4.iter = iter(rk4_data[:,1:])
+        spring_verlet.iter = iter(verlet_data[:,1:])
         
 
         # spring updater
         def spring_updater(spring):
             spring_pos = next(spring.iter)
-            spring.become(ccs(spring_pos, spring.y))
+            set_ccs(spring, spring_pos)
 
 
         self.wait(1.5)
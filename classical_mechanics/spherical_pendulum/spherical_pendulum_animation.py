@@ -1,27 +1,14 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
+from cvc_mobjects import c2p_array, PhaseTrace
 
 
-# processing data
-numerical_data = np.loadtxt("data/spherical_pendulum_data.csv", delimiter = ",", skiprows = 1)
-speed_numerical = 30
-
-length = numerical_data[:,1]
-phi = numerical_data[:,2]
-phi_dot = numerical_data[:,3]
-theta = numerical_data[:,4]
-theta_dot = numerical_data[:,5]
-
-
-# iter for all angels
-length_iter = iter(length[::speed_numerical])
-phi_iter = iter(phi[::speed_numerical])
-theta_iter = iter(theta[::speed_numerical])
-
-# iter for the phase space
-phi_ps_iter = iter(phi[::speed_numerical])
-theta_ps_iter = iter(theta[::speed_numerical])
-phi_dot_ps_iter = iter(phi_dot[::speed_numerical])
-theta_dot_ps_iter = iter(theta_dot[::speed_numerical])
+# animation parameters
+run_time = 20
+speed_numerical = 1.8                           # simulation time per second of video
+phase_trace_tail = None                         # number of frames of the fading phase space traces (None: full traces)
 
 
 
@@ -43,6 +30,14 @@ class PhaseSpace(Mobject):
         self.x_inc = (max(self.x_array) - min(self.x_array)) / 10
         self.xdot_inc = (max(self.xdot_array) - min(self.xdot_array)) / 10
 
+        # cartesian and polar axes, built once
+        self.ax = Axes(x_range = [min(self.x_array) - self.x_inc, max(self.x_array) + self.x_inc, 1], 
+                       y_range = [min(self.xdot_array) - self.xdot_inc, max(self.xdot_array) + self.xdot_inc, 1], 
+                       x_length = self.side_length, 
+                       y_length = self.side_length).move_to(self.center)
+        self.pax = PolarPlane(
+            radius_max = max(max(self.r_array), abs(min(self.r_array))) * 1.1, size = self.side_length).move_to(self.center)
+
         square = Square(side_length = side_length, stroke_width = stroke_width, stroke_color = WHITE, **kwargs).move_to(center)
         self.add(square)
 
@@ -55,21 +50,74 @@ class PhaseSpace(Mobject):
             self.add(x_label, xdot_label)
 
     # method to receive a point in the cartesian plot
-    def c2p(self, x, y, z):
-        ax = Axes(x_range = [min(self.x_array) - self.x_inc, max(self.x_array) + self.x_inc, 1], 
-                  y_range = [min(self.xdot_array) - self.xdot_inc, max(self.xdot_array) + self.xdot_inc, 1], 
-                  x_length = self.side_length, 
-                  y_length = self.side_length).move_to(self.center)
-        return ax.c2p(x, y, z)
+    def c2p(self, x, y, z = 0):
+        return self.ax.c2p(x, y, z)
     
     # method to receive a point in the polar plot
-    def p2p(self, phi, r):
-        pax = PolarPlane(
-            radius_max = max(max(self.r_array), abs(min(self.r_array))) * 1.1, size = self.side_length).move_to(self.center)
-        return pax.pr2pt(r, phi)
+    def p2p(self, phi, r, z = 0):
+        return self.pax.pr2pt(r, phi)
+
+    # method to receive the points in the cartesian plot for an (N, 2) array of phase points (x, xdot)
+    def c2p_array(self, phase_points):
+        return c2p_array(self.ax, phase_points)
+
+    # method to receive the points in the polar plot for an (N, 2) array of phase points (phi, r)
+    def p2p_array(self, phase_points):
+        phi, r = np.asarray(phase_points).T
+        return c2p_array(self.pax, np.column_stack((r * np.cos(phi), r * np.sin(phi))))
     
 
 
+# spherical pendulum in the axes 'ax' (suspended at (0, 0, 10)), built once and moved to new states by 'set_state'
+class SphericalPendulum(VGroup):
+    def __init__(self, ax, r, phi, theta, **kwargs):
+        super().__init__(**kwargs)
+        self.ax = ax
+        self.anchor = np.array(ax.c2p(0, 0, 10))
+        self.rod_end = np.array(ax.c2p(0, 0, 9))
+        ball_size = 0.2
+        self.line = Line3D(start = self.anchor, end = self.rod_end, color = WHITE, thickness = 0.005)
+        self.sphere = Dot3D(point = self.rod_end, radius = ball_size, resolution = (20, 20),).set_color(RED)
+        self.shadow = ax.plot_parametric_curve(lambda phi: np.array([0.1*np.cos(phi), 0.1*np.sin(phi), 0]), t_range = [0, 2*PI], stroke_opacity = 0.675, stroke_width = 5, color = WHITE)
+        self.add(self.line, self.sphere, self.shadow)
+
+        # pendulum in rect (this one is dubiously done, changes in position will fuck everything up)
+        self.line_rect = Line(start = [5.25, -0.25+3/2, 0], end = [5.25, -0.25+3/2 - 3/8, 0])
+        self.line_sphere = Circle(radius = 0.1, color = RED, fill_color = RED, fill_opacity = 1).move_to([5.25, -0.25+3/2 - 3/8, 0])
+        self.add(self.line_rect, self.line_sphere)
+        self.set_state(r, phi, theta)
+
+
+    # returns the matrix rotating and stretching the vector 'old_vector' into 'new_vector' (stretching only along 'old_vector')
+    @staticmethod
+    def get_rod_matrix(old_vector, new_vector):
+        old_length, new_length = np.linalg.norm(old_vector), np.linalg.norm(new_vector)
+        u, w = old_vector / old_length, new_vector / new_length
+        stretch = np.identity(3) + (new_length / old_length - 1) * np.outer(u, u)
+        v, c = np.cross(u, w), np.dot(u, w)
+        if c < -1 + 1e-12:                                                      # antiparallel: half turn about any perpendicular axis
+            axis = np.cross(u, RIGHT if abs(u[0]) < 0.9 else UP)
+            axis /= np.linalg.norm(axis)
+            return (2 * np.outer(axis, axis) - np.identity(3)) @ stretch
+        v_cross = np.array([[0, -v[2], v[1]], [v[2], 0, -v[0]], [-v[1], v[0], 0]])
+        return (np.identity(3) + v_cross + v_cross @ v_cross / (1 + c)) @ stretch
+
+
+    # moves the pendulum to length 'r' and angles 'phi' and 'theta' (rod and rect line are stretched, everything else shifted)
+    def set_state(self, r, phi, theta):
+        x = r * np.cos(phi) * np.sin(theta)
+        y = r * np.sin(phi) * np.sin(theta)
+        z = r * np.cos(theta) + 10
+        rod_end = np.array(self.ax.c2p(x, y, z))
+        self.line.apply_matrix(self.get_rod_matrix(self.rod_end - self.anchor, rod_end - self.anchor), about_point = self.anchor)
+        self.rod_end = rod_end
+        self.sphere.move_to(rod_end)
+        self.shadow.move_to(self.ax.c2p(x, y, 0))
+        self.line_rect.put_start_and_end_on(np.array([5.25, -0.25+3/2, 0]), np.array([5.25, -0.25+3/2 - r / 8 * 3, 0]))
+        self.line_sphere.move_to([5.25, -0.25+3/2 - r / 8 * 3, 0])
+        return self
+
+
 class spherical_pendulum_scene(ThreeDScene):
     def construct(self):
         CVC = Text('CVC', font_size = 12, weight = BOLD, color = WHITE, font = 'Latin Modern Sans').align_on_border(RIGHT + DOWN, buff = 0.2)
@@ -79,6 +127,13 @@ class spherical_pendulum_scene(ThreeDScene):
         text_spherical_pendulum = Title(r"Spherical Pendulum of Variable Length", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT) 
 
 
+        # lazily opened data resampled at the frame times
+        numerical_data = Dataset("data/spherical_pendulum_data.csv")
+        frames = numerical_data.get_frame_resampler(config.frame_rate, run_time, speed = speed_numerical)
+        length, phi, phi_dot, theta, theta_dot = numerical_data.resample(frames, slice(1, 6)).T
+        timeline = ValueTracker(0)
+
+
         # 3D coordinate system with spherical pendulum
         CO3D = [-5, -0.5, -8]
         CO3D_x_range = (-4, 4, 1)
@@ -103,53 +158,35 @@ class spherical_pendulum_scene(ThreeDScene):
                         )
         
 
-        # creates the pendulum in ax
-        def create_pendulum(r, phi, theta):
-            pendulum_group = VGroup()
-            ball_size = 0.2
-            x = r * np.cos(phi) * np.sin(theta)
-            y = r * np.sin(phi) * np.sin(theta)
-            z = r * np.cos(theta) + 10
-            line = Line3D(start = np.array(ax.c2p(0, 0, 10)), end = np.array(ax.c2p(x, y, z)), color = WHITE, thickness = 0.005)
-            sphere = Dot3D(point = ax.c2p(x, y, z), radius = ball_size, resolution = (20, 20),).set_color(RED)
-            shadow = ax.plot_parametric_curve(lambda phi: np.array([0.1*np.cos(phi), 0.1*np.sin(phi), z]), t_range = [0, 2*PI], stroke_opacity = 0.675, stroke_width = 5, color = WHITE).move_to(ax.c2p(x, y, 0))
-            pendulum_group.add(line, sphere, shadow)
-
-            # pendulum in rect (this one is dubiously done, changes in position will fuck everything up)
-            line_rect = Line(start = [5.25, -0.25+3/2, 0], end = [5.25, -0.25+3/2 - r / 8 * 3, 0])
-            line_sphere = Circle(radius = 0.1, color = RED, fill_color = RED, fill_opacity = 1).move_to([5.25, -0.25+3/2 - r / 8 * 3, 0])
-            pendulum_group.add(line_rect, line_sphere)
-            return pendulum_group
-
-
         # pendulum with updater
-        pendulum = create_pendulum(length[0], phi[0], theta[0])
+        pendulum = SphericalPendulum(ax, length[0], phi[0], theta[0])
 
         def pendulum_updater(pendulum):
-            length = next(length_iter)
-            phi = next(phi_iter)
-            theta = next(theta_iter)
-            pendulum.become(create_pendulum(length, phi, theta))
+            frame = frames.get_frame(timeline.get_value())
+            pendulum.set_state(length[frame], phi[frame], theta[frame])
 
 
         # phase space with its two points and their respective updaters
         phase_space = PhaseSpace(center = [2.75, -0.25, 0], phase_array = (np.array([0, 2*PI]), phi_dot, theta, theta_dot), 
             side_length = 3.75, labels = (r'$\vartheta$\,\big|\,$\varphi,\dot{\varphi}$\,(polar)', r'$\dot{\vartheta}$'))
         
-        phi_phase_space = Dot(phase_space.p2p(phi[0], phi_dot[0], 0), radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75)
-        theta_phase_space = Dot(phase_space.c2p(theta[0], theta_dot[0], 0), radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75)
+        # positions of all frames mapped at once
+        phi_points = phase_space.p2p_array(np.column_stack((phi, phi_dot)))
+        theta_points = phase_space.c2p_array(np.column_stack((theta, theta_dot)))
+        phi_phase_space = Dot(phi_points[0], radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75)
+        theta_phase_space = Dot(theta_points[0], radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75)
+        phi_trace = PhaseTrace(phi_points, tail_length = phase_trace_tail, color = BLUE)
+        theta_trace = PhaseTrace(theta_points, tail_length = phase_trace_tail, color = RED)
 
         def phi_ps_updater(dot):
-            phi = next(phi_ps_iter)
-            phi_dot = next(phi_dot_ps_iter)
-            self.add(Line(start = dot.get_center(), end = phase_space.p2p(phi, phi_dot, 0), stroke_width = 1, color = BLUE).set_opacity(0.75))
-            dot.become(Dot(phase_space.p2p(phi, phi_dot, 0), radius = 0.05, color = BLUE, fill_color = BLUE, fill_opacity = 0.75))
+            frame = frames.get_frame(timeline.get_value())
+            phi_trace.set_frame(frame)
+            dot.move_to(phi_points[frame])
 
         def theta_ps_updater(dot):
-            theta = next(theta_ps_iter)
-            theta_dot = next(theta_dot_ps_iter)
-            self.add(Line(start = dot.get_center(), end = phase_space.c2p(theta, theta_dot, 0), stroke_width = 1, color = RED).set_opacity(0.75))
-            dot.become(Dot(phase_space.c2p(theta, theta_dot, 0), radius = 0.05, color = RED, fill_color = RED, fill_opacity = 0.75))
+            frame = frames.get_frame(timeline.get_value())
+            theta_trace.set_frame(frame)
+            dot.move_to(theta_points[frame])
 
 
         # length diagram (ugly programming right here)
@@ -161,14 +198,13 @@ class spherical_pendulum_scene(ThreeDScene):
 
         self.add(text_spherical_pendulum)
         self.add(spherical_pendulum_ax_group, phase_space)
-        self.add(pendulum, phi_phase_space, theta_phase_space)
+        self.add(pendulum, phi_trace, theta_trace, phi_phase_space, theta_phase_space)
         
         self.wait(1.5)
-        timeline = ValueTracker(0)
         pendulum.add_updater(pendulum_updater)
         phi_phase_space.add_updater(phi_ps_updater)
         theta_phase_space.add_updater(theta_ps_updater)
-        self.play(timeline.animate.set_value(5), rate_func = linear, run_time = 20)
+        self.play(timeline.animate.set_value(run_time), rate_func = linear, run_time = run_time)
         pendulum.remove_updater(pendulum_updater)
         phi_phase_space.remove_updater(phi_ps_updater)
         theta_phase_space.remove_updater(theta_ps_updater)
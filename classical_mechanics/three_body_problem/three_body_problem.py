@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.append("../..")
+from cvc_numerics import verlet_step, verlet_step2, yoshida4_step, yoshida6_step, yoshida4_weights, logh_step, integrate, integrate_adaptive
+from cvc_data import load_data, FrameResampler
+
+
+# body masses in sun masses (same as in three_body_problem.c)
+masses = np.array([10e0, 10e0, 20e0])
+G = 4 * np.pi**2                                                        # gravitation constant
+smoothing_factor = 10e-1                                                # avoiding numerical errors while dividing by 0
+
+# integration parameters
+T_max = 50
+delta_t = 10e-5                                                         # fixed time step of three_body_problem.c
+rtol = 1e-9                                                             # relative error tolerance of the adaptive integration
+atol = 1e-9                                                             # absolute error tolerance of the adaptive integration
+symplectic_delta_t = 5e-3                                               # maximum time step of the symplectic integration
+
+# symplectic integration steps
+symplectic_steps = {"verlet": verlet_step2, "yoshida4": yoshida4_step, "yoshida6": yoshida6_step}
+
+# initial states (positions of m1, m2, m3 and velocities of m1, m2, m3)
+initial_states = {
+    "2D": np.array([-4, 0, 0, 2, -2, 0, 0, 2, 0, 1, 0, 0, -1, 0, 0, 0, 0, 0], dtype = float),
+    "3D": np.array([-10, 0, 0, 10, 0, 0, 0, np.sqrt(30), 0.001, 1, 0.1, 0, -1, 0, 0, 0.5, 0, 0], dtype = float),
+}
+
+
+# gravitational accelerations of the bodies at 'positions' (n_systems, N, 3) by all other bodies of the 'masses' (pairwise by broadcasting,
+# the distances smoothed by 'smoothing_factor' as in three_body_problem.c)
+def get_accelerations(positions, masses = masses):
+    delta = positions[:,:,np.newaxis,:] - positions[:,np.newaxis,:,:]  # r_i - r_j
+    r = np.sqrt(np.sum(delta**2, axis = -1, keepdims = True)) + smoothing_factor
+    return -G * np.sum(masses[np.newaxis,np.newaxis,:,np.newaxis] * delta / r**3, axis = 2)
+
+
+# ODE for the sun positions in the state arrays y (dim 0: system, dim 1: 9 positions and 9 velocities)
+def ThreeBody_ODE(t, y, params = None):
+    f = np.empty_like(y)
+    f[:,:9] = y[:,9:]
+    f[:,9:] = get_accelerations(y[:,:9].reshape(-1, 3, 3)).reshape(-1, 9)
+    return f
+
+
+# kinetic energies of the state arrays y (dim 0: system)
+def get_kinetic_energy(y):
+    velocities = y[:,9:].reshape(-1, 3, 3)
+    return np.sum(masses / 2 * np.sum(velocities**2, axis = -1), axis = -1)
+
+
+# (positive) potential energies of the state arrays y, the potential of the smoothed forces: G m_i m_j (r + s/2) / (r + s)^2 for every pair
+def get_potential_energy(y):
+    positions = y[:,:9].reshape(-1, 3, 3)
+    r = np.sqrt(np.sum((positions[:,:,np.newaxis,:] - positions[:,np.newaxis,:,:])**2, axis = -1))
+    pair_potential = G * np.outer(masses, masses) * (r + smoothing_factor/2) / (r + smoothing_factor)**2
+    return np.sum(np.triu(pair_potential, 1), axis = (-2, -1))
+
+
+# total energies of the state arrays y
+def get_energy(y):
+    return get_kinetic_energy(y) - get_potential_energy(y)
+
+
+# total angular momenta (dim 0: system, dim 1: coordinate) of the state arrays y
+def get_angular_momentum(y):
+    positions = y[:,:9].reshape(-1, 3, 3)
+    velocities = y[:,9:].reshape(-1, 3, 3)
+    return np.sum(masses[:,np.newaxis] * np.cross(positions, velocities), axis = 1)
+
+
+# returns the maximum relative energy drift |E/E_0 - 1| and angular momentum drift |L - L_0| / |L_0| of every system over the states
+# 'y_array' (dim 0: time, dim 1: system)
+def get_drift(y_array):
+    energy_array = np.array([get_energy(y) for y in y_array])
+    angular_momentum_array = np.array([get_angular_momentum(y) for y in y_array])
+    energy_drift = np.max(np.abs(energy_array / energy_array[0] - 1), axis = 0)
+    angular_momentum_drift = np.max(np.linalg.norm(angular_momentum_array - angular_momentum_array[0], axis = -1), axis = 0) / np.linalg.norm(angular_momentum_array[0], axis = -1)
+    return energy_drift, angular_momentum_drift
+
+
+# integrates the initial states 'y0' with time-transformed yoshida steps (logarithmic hamiltonian) of the fictitious time 'delta_s' until
+# every system has reached the physical time 't_max' and returns the physical times (dim 0: step, dim 1: system) and the states of every
+# 'stride'-th step (the physical step delta_s / U shrinks in close encounters, so 'delta_s' ~ U * dt for a typical time step dt)
+def integrate_logh(y0, t_max, delta_s, stride = 1):
+    y = np.array(y0, dtype = float, ndmin = 2)
+    t = np.zeros(len(y))
+    binding_energy = -get_energy(y)
+    t_list, y_list = [t.copy()], [y.copy()]
+    step_i = 0
+    while np.min(t) < t_max:
+        logh_step(t, delta_s, y, ThreeBody_ODE, None, get_kinetic_energy, get_potential_energy, binding_energy, yoshida4_weights)
+        step_i += 1
+        if step_i % stride == 0:
+            t_list.append(t.copy())
+            y_list.append(y.copy())
+    return np.array(t_list), np.array(y_list)
+
+
+# returns the positions 'states' (..., 18) relative to the center of mass as (..., 3, 3) arrays (dim -2: body, dim -1: coordinate)
+def get_com_positions(states):
+    positions = states[...,:9].reshape(states.shape[:-1] + (3, 3))
+    com = np.sum(masses[:,np.newaxis] * positions, axis = -2, keepdims = True) / np.sum(masses)
+    return positions - com
+
+
+# returns the positions of the suns of the 'setup' ("2D" / "3D") relative to the center of mass at the times 't_frames' (dim 0: frame,
+# dim 1: body, dim 2: coordinate) and the number of steps: integrated adaptively and sampled from the dense output ('method' "rk45") or
+# with the symplectic step 'method' of at most 'symplectic_delta_t' fitted into the (equidistant) frames
+def get_three_body_positions(setup, t_frames, method = "rk45", rtol = rtol, atol = atol):
+    if method == "rk45":
+        y_array, n_steps = integrate_adaptive(ThreeBody_ODE, initial_states[setup], 0, t_frames, rtol = rtol, atol = atol)
+        return get_com_positions(y_array[:,0]), n_steps
+    frame_delta_t = t_frames[1] - t_frames[0]
+    n_substeps = int(np.ceil(frame_delta_t / symplectic_delta_t))
+    t_array, y_array = integrate(symplectic_steps[method], ThreeBody_ODE, initial_states[setup], t_frames[0], t_frames[-1], frame_delta_t / n_substeps, stride = n_substeps)
+    return get_com_positions(y_array[:,0]), (len(t_array) - 1) * n_substeps
+
+
+# adaptive integration against the fixed verlet steps of three_body_problem.c (integrated here in python up to 'T_compare' and, if
+# written by 'make run', read from the csv files up to T_max)
+if __name__ == "__main__":
+    framerate = 60
+    simulation_speed = 0.6
+    T_compare = 2
+
+    for setup in initial_states:
+        t_frames = np.arange(0, T_max, simulation_speed / framerate)
+        start_time = time.perf_counter()
+        positions, n_steps = get_three_body_positions(setup, t_frames)
+        print(f"{setup}: {n_steps} adaptive steps for {len(t_frames)} frames in {time.perf_counter() - start_time:.3f} s "
+              f"(fixed step: {int(T_max / delta_t)} steps)")
+
+        # python verlet with the fixed step
+        n_compare = np.searchsorted(t_frames, T_compare, side = "right")
+        start_time = time.perf_counter()
+        t_array, y_array = integrate(verlet_step, ThreeBody_ODE, initial_states[setup], 0, T_compare, delta_t)
+        verlet_positions = FrameResampler(t_array, framerate, T_compare / simulation_speed, simulation_speed).resample(get_com_positions(y_array[:,0]))
+        print(f"{setup}: fixed verlet up to t={T_compare} in {time.perf_counter() - start_time:.3f} s, "
+              f"max. deviation {np.max(np.abs(verlet_positions[:n_compare] - positions[:n_compare])):.3g}")
+
+        # C verlet with the fixed step (deviation growing over time in the chaotic system)
+        csv_path = f"data/ThreeBody_{setup}_data.csv"
+        if os.path.exists(csv_path):
+            data = load_data(csv_path)
+            c_positions = FrameResampler(data[:,0], framerate, T_max / simulation_speed, simulation_speed).resample(data, slice(1, 10))
+            deviation = np.max(np.abs(c_positions[:len(t_frames)].reshape(-1, 3, 3) - positions), axis = (1, 2))
+            for t_check in (1, 5, 10, 25, T_max):
+                print(f"{setup}: max. deviation from C up to t={t_check}: {np.max(deviation[t_frames <= t_check]):.3g}")
+
+    # long runs of both setups at once: energy and angular momentum drift of the symplectic integrators (one evaluation of the forces per
+    # substep: 1 for verlet, 3 for yoshida4 and 7 for yoshida6) and of the time-transformed yoshida4 against the adaptive integration
+    T_long = 100
+    y0 = np.array(list(initial_states.values()))
+    for method, long_delta_t in (("verlet", 1e-3), ("yoshida4", 2e-3), ("yoshida6", 4e-3)):
+        start_time = time.perf_counter()
+        t_array, y_array = integrate(symplectic_steps[method], ThreeBody_ODE, y0, 0, T_long, long_delta_t, stride = 100)
+        energy_drift, angular_momentum_drift = get_drift(y_array)
+        print(f"{method}, dt={long_delta_t}, t={T_long}: {time.perf_counter() - start_time:.3f} s, energy drift {energy_drift}, angular momentum drift {angular_momentum_drift}")
+
+    start_time = time.perf_counter()
+    t_array, y_array = integrate_logh(y0, T_long, 3, stride = 100)
+    energy_drift, angular_momentum_drift = get_drift(y_array)
+    print(f"logh yoshida4, ds=3, t={T_long}: {time.perf_counter() - start_time:.3f} s, energy drift {energy_drift}, angular momentum drift {angular_momentum_drift}")
+
+    start_time = time.perf_counter()
+    y_array, n_steps = integrate_adaptive(ThreeBody_ODE, y0, 0, np.linspace(0, T_long, 1001))
+    energy_drift, angular_momentum_drift = get_drift(y_array)
+    print(f"rk45, {n_steps} steps, t={T_long}: {time.perf_counter() - start_time:.3f} s, energy drift {energy_drift}, angular momentum drift {angular_momentum_drift}")
@@ -1,26 +1,34 @@
 from manim import *
-
-
-TBP_2D_data = np.loadtxt("data/ThreeBody_2D_data.csv", delimiter = ",", skiprows = 1)
-# TBP_2D_data = np.loadtxt("data/A1a_Argon_Positions.csv", delimiter = ",", skiprows = 1)
-TBP_3D_data = np.loadtxt("data/ThreeBody_3D_data.csv", delimiter = ",", skiprows = 1)
-
-r1_2D = TBP_2D_data[:,1:4]
-r2_2D = TBP_2D_data[:,4:7]
-r3_2D = TBP_2D_data[:,7:10]
-
-r1_3D = TBP_3D_data[:,1:4]
-r2_3D = TBP_3D_data[:,4:7]
-r3_3D = TBP_3D_data[:,7:10]
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset, FrameResampler
+from cvc_mobjects import FadingTail
+from three_body_problem import get_three_body_positions
 
 
 # provide paramters
-framerate = 60
 run_time = 30
-sun_speed = 100
+simulation_speed = 0.6                          # simulation time per second of video
 fade_length = 50
 tail = False
 
+# source of the data ("python": integrated adaptively and sampled at the frame times by three_body_problem.py, "csv": the files written
+# by three_body_problem.c, resampled at the frame times)
+data_source = "python"
+integrator = "rk45"                             # integration of the python data ("rk45": adaptive, "verlet" / "yoshida4" / "yoshida6": symplectic)
+
+
+# returns the frame resampler and the positions of the suns of the 'setup' ("2D" / "3D") at every frame (dim 0: frame, dim 1: sun, dim 2:
+# coordinate)
+def get_frames_and_positions(setup):
+    if data_source == "python":
+        t_frames = simulation_speed * np.arange(int(round(run_time * config.frame_rate)) + 1) / config.frame_rate
+        frames = FrameResampler(t_frames, config.frame_rate, run_time, speed = simulation_speed)
+        return frames, get_three_body_positions(setup, frames.t_frames, method = integrator)[0]
+    TBP_data = Dataset(f"data/ThreeBody_{setup}_data.csv")
+    frames = TBP_data.get_frame_resampler(config.frame_rate, run_time, speed = simulation_speed)
+    return frames, TBP_data.resample(frames, slice(1, 10)).reshape(-1, 3, 3)
+
 
 # main 2D animation
 class three_body_problem_scene(Scene):
@@ -32,91 +40,36 @@ class three_body_problem_scene(Scene):
         # headline and vectorfeld
         text_TBP = Title("The 3-Body-Problem", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT)  
 
+        # positions of the suns at the frame times
+        frames, positions = get_frames_and_positions("2D")
+
         # creation of the 3 suns
         sun1 = VGroup(Circle(color = WHITE, radius = 0.1, fill_color = WHITE, fill_opacity = 0.5))
         sun2 = VGroup(Circle(color = RED, radius = 0.1, fill_color = RED, fill_opacity = 0.5))
         sun3 = VGroup(Circle(color = YELLOW, radius = 0.1, fill_color = YELLOW, fill_opacity = 0.5))
 
-        # position iters of the 3 suns
-        sun1.iter = iter(r1_2D[::sun_speed,])
-        sun2.iter = iter(r2_2D[::sun_speed,])
-        sun3.iter = iter(r3_2D[::sun_speed,])
+        # positions of the 3 suns at every frame
+        sun1.positions = positions[:,0]
+        sun2.positions = positions[:,1]
+        sun3.positions = positions[:,2]
 
-        # updater of the suns positions
+        # tails of the 3 suns
+        sun1.tail = FadingTail(fade_length, color = WHITE)
+        sun2.tail = FadingTail(fade_length, color = RED)
+        sun3.tail = FadingTail(fade_length, color = YELLOW)
+        self.add(sun1.tail, sun2.tail, sun3.tail)
+
+        # updater of the suns positions and their tails
         def sun_updater(sun):
-            sun.move_to(next(sun.iter))
-
-        # tail updater
-        def dot1_fadeout_updater(dot1):
-            if dot1.counter != fade_length and dot1.counter != 1:
-                dot1.fill_opacity -= 1/fade_length
-                dot1.set_opacity(dot1.fill_opacity)
-                dot1.counter -= 1                
-            elif dot1.counter == fade_length:
-                dot1.move_to(sun1.get_center())
-                dot1.fill_opacity = 1
-                dot1.set_opacity(dot1.fill_opacity)
-                dot1.counter -= 1
-            else:
-                dot1.counter = fade_length
-                dot1.fill_opacity = 1
-
-        def dot2_fadeout_updater(dot2):
-            if dot2.counter != fade_length and dot2.counter != 1:
-                dot2.fill_opacity -= 1/fade_length
-                dot2.set_opacity(dot2.fill_opacity)
-                dot2.counter -= 1                
-            elif dot2.counter == fade_length:
-                dot2.move_to(sun2.get_center())
-                dot2.fill_opacity = 1
-                dot2.set_opacity(dot2.fill_opacity)
-                dot2.counter -= 1
-            else:
-                dot2.counter = fade_length
-                dot2.fill_opacity = 1           
-
-        def dot3_fadeout_updater(dot3):
-            if dot3.counter != fade_length and dot3.counter != 1:
-                dot3.fill_opacity -= 1/fade_length
-                dot3.set_opacity(dot3.fill_opacity)
-                dot3.counter -= 1
-            elif dot3.counter == fade_length:
-                dot3.move_to(sun3.get_center())
-                dot3.fill_opacity = 1
-                dot3.set_opacity(dot3.fill_opacity)
-                dot3.counter -= 1
-            else:
-                dot3.counter = fade_length
-                dot3.fill_opacity = 1
-
-        # adding the tail
-        for i in range(fade_length):
-            dot1 = Dot(radius = 0.05, fill_color = WHITE, fill_opacity = 0.5)
-            dot1.counter = fade_length + i
-            dot1.fill_opacity = 0
-            dot1.set_opacity(dot1.fill_opacity)
-            self.add(dot1)
-            dot1.add_updater(dot1_fadeout_updater)
-
-            dot2 = Dot(radius = 0.05, fill_color = RED, fill_opacity = 0.5)
-            dot2.counter = fade_length + i
-            dot2.fill_opacity = 0
-            dot2.set_opacity(dot2.fill_opacity)
-            self.add(dot2)
-            dot2.add_updater(dot2_fadeout_updater)
-
-            dot3 = Dot(radius = 0.05, fill_color = YELLOW, fill_opacity = 0.5)
-            dot3.counter = fade_length + i
-            dot3.fill_opacity = 0
-            dot3.set_opacity(dot3.fill_opacity)
-            self.add(dot3)
-            dot3.add_updater(dot3_fadeout_updater)
+            position = sun.positions[frames.get_frame(timeline.get_value())]
+            sun.move_to(position)
+            sun.tail.push(position)
 
 
         # initial sun positions
-        sun1.move_to(r1_2D[0,:])
-        sun2.move_to(r2_2D[0,:])
-        sun3.move_to(r3_2D[0,:])
+        sun1.move_to(sun1.positions[0])
+        sun2.move_to(sun2.positions[0])
+        sun3.move_to(sun3.positions[0])
 
         # adding the suns
         self.add(sun1, sun2, sun3)
@@ -130,7 +83,7 @@ class three_body_problem_scene(Scene):
         sun3.add_updater(sun_updater)
 
         # timeline as ValueTracker
-        self.play(timeline.animate.set_value(5), rate_func= linear, run_time = run_time)
+        self.play(timeline.animate.set_value(run_time), rate_func= linear, run_time = run_time)
         sun1.remove_updater(sun_updater)
         sun2.remove_updater(sun_updater)
         sun3.remove_updater(sun_updater)
@@ -144,93 +97,39 @@ class TBP_main_3D(ThreeDScene):
         self.set_camera_orientation(phi=75*DEGREES, theta=-45*DEGREES)
         axes = ThreeDAxes()
 
+        # positions of the suns at the frame times
+        frames, positions = get_frames_and_positions("3D")
+
         # creation of the 3 suns
         sun1 = VGroup(Sphere(radius = 0.15, resolution = (16, 16)).set_color(WHITE))
         sun2 = VGroup(Sphere(radius = 0.15, resolution = (16, 16)).set_color(RED))
         sun3 = VGroup(Sphere(radius = 0.15, resolution = (16, 16)).set_color(YELLOW))
 
-        # position iters of the 3 suns
-        sun1.iter = iter(r1_3D[::sun_speed,])
-        sun2.iter = iter(r2_3D[::sun_speed,])
-        sun3.iter = iter(r3_3D[::sun_speed,])
+        # positions of the 3 suns at every frame
+        sun1.positions = positions[:,0]
+        sun2.positions = positions[:,1]
+        sun3.positions = positions[:,2]
 
-        # updater of the sun positions
-        def sun_updater(sun):
-            sun.move_to(next(sun.iter))
-
-        # tail updater
-        def dot1_fadeout_updater(dot1):
-            if dot1.counter != fade_length and dot1.counter != 1:
-                dot1.fill_opacity -= 1/fade_length
-                dot1.set_opacity(dot1.fill_opacity)
-                dot1.counter -= 1                
-            elif dot1.counter == fade_length:
-                dot1.move_to(sun1.get_center())
-                dot1.fill_opacity = 1
-                dot1.set_opacity(dot1.fill_opacity)
-                dot1.counter -= 1
-            else:
-                dot1.counter = fade_length
-                dot1.fill_opacity = 1
-
-        def dot2_fadeout_updater(dot2):
-            if dot2.counter != fade_length and dot2.counter != 1:
-                dot2.fill_opacity -= 1/fade_length
-                dot2.set_opacity(dot2.fill_opacity)
-                dot2.counter -= 1                
-            elif dot2.counter == fade_length:
-                dot2.move_to(sun2.get_center())
-                dot2.fill_opacity = 1
-                dot2.set_opacity(dot2.fill_opacity)
-                dot2.counter -= 1
-            else:
-                dot2.counter = fade_length
-                dot2.fill_opacity = 1           
-
-        def dot3_fadeout_updater(dot3):
-            if dot3.counter != fade_length and dot3.counter != 1:
-                dot3.fill_opacity -= 1/fade_length
-                dot3.set_opacity(dot3.fill_opacity)
-                dot3.counter -= 1
-            elif dot3.counter == fade_length:
-                dot3.move_to(sun3.get_center())
-                dot3.fill_opacity = 1
-                dot3.set_opacity(dot3.fill_opacity)
-                dot3.counter -= 1
-            else:
-                dot3.counter = fade_length
-                dot3.fill_opacity = 1
-
-        # adding the tails
+        # tails of the 3 suns (flat dots facing the camera)
+        sun1.tail = FadingTail(fade_length, color = WHITE)
+        sun2.tail = FadingTail(fade_length, color = RED)
+        sun3.tail = FadingTail(fade_length, color = YELLOW)
         if tail:
-            for i in range(fade_length):
-                dot1 = Dot3D(radius = 0.05).set_color(WHITE)
-                dot1.counter = fade_length + i
-                dot1.fill_opacity = 0
-                dot1.set_opacity(dot1.fill_opacity)
-                self.add(dot1)
-                dot1.add_updater(dot1_fadeout_updater)
-
-                dot2 = Dot3D(radius = 0.05).set_color(RED)
-                dot2.counter = fade_length + i
-                dot2.fill_opacity = 0
-                dot2.set_opacity(dot2.fill_opacity)
-                self.add(dot2)
-                dot2.add_updater(dot2_fadeout_updater)
-
-                dot3 = Dot3D(radius = 0.05).set_color(YELLOW)
-                dot3.counter = fade_length + i
-                dot3.fill_opacity = 0
-                dot3.set_opacity(dot3.fill_opacity)
-                self.add(dot3)
-                dot3.add_updater(dot3_fadeout_updater)
-        
+            self.add_fixed_orientation_mobjects(*sun1.tail, *sun2.tail, *sun3.tail)
+
+        # updater of the sun positions and their tails
+        def sun_updater(sun):
+            position = sun.positions[frames.get_frame(timeline.get_value())]
+            sun.move_to(position)
+            if tail:
+                sun.tail.push(position)
+
         # adding the suns
         self.add(axes, sun1, sun2, sun3)
 
-        sun1.move_to(r1_3D[0,:])
-        sun2.move_to(r2_3D[0,:])
-        sun3.move_to(r3_3D[0,:])
+        sun1.move_to(sun1.positions[0])
+        sun2.move_to(sun2.positions[0])
+        sun3.move_to(sun3.positions[0])
         
         self.begin_ambient_camera_rotation(rate = 0.15)
 
@@ -240,4 +139,4 @@ class TBP_main_3D(ThreeDScene):
         sun3.add_updater(sun_updater)
 
         # timeline as ValueTracker
-        self.play(timeline.animate.set_value(5), rate_func= linear, run_time = run_time)
\ No newline at end of file
+        self.play(timeline.animate.set_value(run_time), rate_func= linear, run_time = run_time)
\ No newline at end of file
@@ -0,0 +1,248 @@
+import os
+import itertools
+import numpy as np
+
+
+# returns the paths of the binary cache and of its header file belonging to the csv file at 'csv_path'
+def get_cache_paths(csv_path):
+    stem = os.path.splitext(csv_path)[0]
+    return stem + ".npy", stem + "_header.txt"
+
+
+# checks whether the binary cache of the csv file at 'csv_path' is missing or older than the csv file itself
+def is_cache_stale(csv_path):
+    npy_path, header_path = get_cache_paths(csv_path)
+    if not os.path.exists(npy_path) or not os.path.exists(header_path):
+        return True
+    if not os.path.exists(csv_path):                                        # csv file removed: the cache is all that is left
+        return False
+    return os.path.getmtime(npy_path) < os.path.getmtime(csv_path)
+
+
+# returns the column names of the csv file at 'csv_path' (taken from the last header line, numbered for header-less files)
+def read_csv_columns(csv_path, skiprows = 1):
+    with open(csv_path, "r") as csv_file:
+        header_lines = [csv_file.readline() for _ in range(skiprows)]
+        first_row = csv_file.readline()
+    if skiprows:
+        return [column.strip() for column in header_lines[-1].split(",")]
+    return [str(i) for i in range(first_row.count(",") + 1)]
+
+
+# streams the csv file at 'csv_path' as arrays of at most 'chunk_size' rows, keeping only every 'stride'-th data row from row 'start'
+# on and optionally only the given 'columns' (names or indices); skipped rows are never parsed, so the memory stays bounded
+def iter_csv_chunks(csv_path, chunk_size = 10000, stride = 1, start = 0, skiprows = 1, columns = None):
+    if isinstance(columns, str):
+        columns = [columns]
+    if isinstance(columns, (list, tuple)):
+        names = read_csv_columns(csv_path, skiprows)
+        columns = [names.index(column) if isinstance(column, str) else column for column in columns]
+    with open(csv_path, "r") as csv_file:
+        rows = (line for line in itertools.islice(csv_file, skiprows, None) if line.strip())
+        rows = itertools.islice(rows, start, None, stride)
+        while True:
+            lines = list(itertools.islice(rows, chunk_size))
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, delimiter = ",", ndmin = 2)
+            yield chunk if columns is None else chunk[:,columns]
+
+
+# streams the csv file at 'csv_path' row by row (parsed chunk by chunk, see 'iter_csv_chunks')
+def iter_csv_rows(csv_path, chunk_size = 10000, stride = 1, start = 0, skiprows = 1, columns = None):
+    for chunk in iter_csv_chunks(csv_path, chunk_size, stride, start, skiprows, columns):
+        yield from chunk
+
+
+# converts the csv file at 'csv_path' once into a binary .npy cache, parsing 'block_size' rows at a time to bound the memory
+def convert_csv(csv_path, skiprows = 1, block_size = 10000):
+    npy_path, header_path = get_cache_paths(csv_path)
+
+    # the last header line names the columns, the first data row determines their number
+    columns = read_csv_columns(csv_path, skiprows)
+    with open(csv_path, "r") as csv_file:
+        n_columns = next(line for line in itertools.islice(csv_file, skiprows, None) if line.strip()).count(",") + 1
+
+    # counting the data rows without parsing them
+    with open(csv_path, "rb") as csv_file:
+        n_rows = sum(1 for line in itertools.islice(csv_file, skiprows, None) if line.strip())
+
+    # parsing the csv file block by block straight into the memory-mapped cache file
+    data = np.lib.format.open_memmap(npy_path + ".tmp", mode = "w+", dtype = np.float64, shape = (n_rows, n_columns))
+    row_i = 0
+    for block in iter_csv_chunks(csv_path, block_size, skiprows = skiprows):
+        data[row_i:row_i+len(block)] = block
+        row_i += len(block)
+    data.flush()
+    del data
+
+    # replacing the old cache only once the new one is complete
+    with open(header_path, "w") as header_file:
+        header_file.write("\n".join(columns) + "\n")
+    os.replace(npy_path + ".tmp", npy_path)
+    return npy_path
+
+
+# returns the data of the csv file at 'csv_path' memory-mapped from its binary cache (rebuilt whenever the csv file is newer)
+def load_data(csv_path, skiprows = 1):
+    if is_cache_stale(csv_path):
+        convert_csv(csv_path, skiprows)
+    return np.load(get_cache_paths(csv_path)[0], mmap_mode = "r")
+
+
+# returns the column names of the csv file at 'csv_path' as stored next to its binary cache
+def load_columns(csv_path, skiprows = 1):
+    if is_cache_stale(csv_path):
+        convert_csv(csv_path, skiprows)
+    with open(get_cache_paths(csv_path)[1], "r") as header_file:
+        return [column.rstrip("\n") for column in header_file]
+
+
+# data set of the csv file at 'csv_path' reduced to every 'stride'-th row from row 'start' on, opened only once it is accessed
+class Dataset:
+    def __init__(self, csv_path, stride = 1, start = 0, skiprows = 1):
+        self.csv_path = csv_path
+        self.stride = stride
+        self.start = start
+        self.skiprows = skiprows
+        self._data = None
+        self._columns = None
+
+
+    # strided view of the memory-mapped data (no rows are read until they are indexed)
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = load_data(self.csv_path, self.skiprows)[self.start::self.stride]
+        return self._data
+
+
+    # column names of the data set
+    @property
+    def columns(self):
+        if self._columns is None:
+            self._columns = load_columns(self.csv_path, self.skiprows)
+        return self._columns
+
+
+    # number of strided rows
+    def __len__(self):
+        return len(self.data)
+
+
+    # reads the indexed strided rows / columns from disk
+    def __getitem__(self, key):
+        return np.array(self.data[key])
+
+
+    # converts a column name (or list of names) into the respective column index
+    def get_column_index(self, column):
+        if isinstance(column, str):
+            return self.columns.index(column)
+        if isinstance(column, (list, tuple)):
+            return [self.get_column_index(column_i) for column_i in column]
+        return column
+
+
+    # returns the strided rows of the given 'column' (name or index)
+    def column(self, column):
+        return self[:,self.get_column_index(column)]
+
+
+    # returns the resampler mapping the (unstrided) 'time_column' onto the video frames
+    def get_frame_resampler(self, framerate, run_time, speed = None, time_column = 0):
+        return FrameResampler(load_data(self.csv_path, self.skiprows)[:,self.get_column_index(time_column)], framerate, run_time, speed)
+
+
+    # returns the given 'columns' (unstrided) interpolated at every frame of the resampler 'frames'
+    def resample(self, frames, columns = slice(None)):
+        return frames.resample(load_data(self.csv_path, self.skiprows), self.get_column_index(columns))
+
+
+    # returns an iterator over the strided rows of the given 'columns', reading 'chunk_size' rows from disk at a time
+    def iter_rows(self, columns = slice(None), chunk_size = 1000):
+        columns = self.get_column_index(columns)
+        for chunk_start in range(0, len(self), chunk_size):
+            yield from self[chunk_start:chunk_start+chunk_size, columns]
+
+
+# vectorized bisection returning for every value in 'values' the index of the last entry in the sorted 'sorted_array' not greater than it
+# (only touches log2(len(sorted_array)) entries per value, so memory-mapped arrays are not read as a whole)
+def bisect_array(sorted_array, values):
+    low = np.zeros(len(values), dtype = int)
+    high = np.full(len(values), len(sorted_array) - 1)
+    while np.any(high - low > 1):
+        middle = (low + high) // 2
+        go_right = sorted_array[middle] <= values
+        low = np.where(go_right, middle, low)
+        high = np.where(go_right, high, middle)
+    return np.where(sorted_array[high] <= values, high, low)
+
+
+# maps the simulation time array 't_array' onto the frames of a video with 'framerate' and 'run_time' (in seconds): either spanning
+# the whole simulation or advancing 'speed' simulation time units per second of video
+class FrameResampler:
+    def __init__(self, t_array, framerate, run_time, speed = None):
+        self.framerate = framerate
+        self.run_time = run_time
+        self.n_frames = int(round(run_time * framerate)) + 1
+        t_start = t_array[0]
+        t_end = t_array[len(t_array)-1]
+        if speed is None:
+            speed = (t_end - t_start) / run_time
+        self.speed = speed
+
+        # simulation time of every frame (held at the last sample once the simulation is exhausted)
+        self.t_frames = np.minimum(t_start + speed * np.arange(self.n_frames) / framerate, t_end)
+
+        # index of the sample left and right of each frame time and the interpolation weight of the right one (a single sample: constant)
+        self.index = np.minimum(bisect_array(t_array, self.t_frames), max(len(t_array) - 2, 0))
+        self.right_index = np.minimum(self.index + 1, len(t_array) - 1)
+        t_left = np.asarray(t_array[self.index])
+        t_right = np.asarray(t_array[self.right_index])
+        delta_t = t_right - t_left
+        self.weight = np.divide(self.t_frames - t_left, delta_t, out = np.zeros(self.n_frames), where = delta_t > 0)
+
+
+    # returns the index of the frame shown at 'time' seconds into the animation
+    def get_frame(self, time):
+        return min(max(int(round(time * self.framerate)), 0), self.n_frames - 1)
+
+
+    # returns the 'values' (first axis: simulation samples) linearly interpolated at every frame, optionally only the given 'columns'
+    def resample(self, values, columns = None):
+        left = np.asarray(values[self.index])
+        right = np.asarray(values[self.right_index])
+        if columns is not None:
+            left, right = left[:,columns], right[:,columns]
+        weight = self.weight.reshape((-1,) + (1,) * (left.ndim - 1))
+        return (1 - weight) * left + weight * right
+
+
+# bins the points ('x_array', 'y_array') into a grid of 'bins' = (n_x, n_y) bins spanning 'x_range' x 'y_range' in a single pass (points
+# outside are dropped, points on the upper edges fall into the last bins), adding to the given 'counts' if any; the counts are laid out as
+# an image (dim 0: y from the top, dim 1: x)
+def histogram_2d(x_array, y_array, x_range, y_range, bins, counts = None):
+    n_x, n_y = bins
+    if counts is None:
+        counts = np.zeros((n_y, n_x))
+    x_array, y_array = np.asarray(x_array), np.asarray(y_array)
+    x_i = np.floor((x_array - x_range[0]) / (x_range[1] - x_range[0]) * n_x).astype(int)
+    y_i = np.floor((y_array - y_range[0]) / (y_range[1] - y_range[0]) * n_y).astype(int)
+    x_i[x_array == x_range[1]] = n_x - 1
+    y_i[y_array == y_range[1]] = n_y - 1
+    inside = (x_i >= 0) & (x_i < n_x) & (y_i >= 0) & (y_i < n_y)
+    counts += np.bincount((n_y - 1 - y_i[inside]) * n_x + x_i[inside], minlength = n_x * n_y).reshape(n_y, n_x)
+    return counts
+
+
+# returns the histogram 'counts' scaled logarithmically to densities between 0 (empty) and 1 (fullest bin)
+def log_density(counts):
+    return np.log1p(counts) / np.log1p(max(np.max(counts), 1))
+
+
+# check of the histogram edges: points on the lower and upper edges are counted in the first and last bins, points outside are dropped
+if __name__ == "__main__":
+    edge_counts = histogram_2d([0, 4, 4, 4.1], [0, 1, 0.5, 0.5], (0, 4), (0, 1), (801, 400))
+    assert edge_counts[-1,0] == 1 and edge_counts[0,-1] == 1 and edge_counts[199,-1] == 1 and np.sum(edge_counts) == 3
+    print("histogram_2d: points on the upper edges counted")
@@ -0,0 +1,278 @@
+from manim import *
+from cvc_data import histogram_2d, log_density
+
+
+# maps the (N, dim) array 'coords' of coordinates of the (linear) axes 'ax' to scene points in one array operation: the affine
+# map of the axes is probed once at the origin and the unit vectors
+def c2p_array(ax, coords):
+    coords = np.asarray(coords, dtype = float)
+    dim = coords.shape[-1]
+    origin = np.array(ax.c2p(*np.zeros(dim)))
+    basis = np.array([np.array(ax.c2p(*unit_vector)) - origin for unit_vector in np.eye(dim)])
+    return origin + coords @ basis
+
+
+# polyline through the scene points 'points' drawn as a single VMobject, growable up to any number of its points (the bezier
+# points of the whole polyline are computed once, drawing a part of it only slices them)
+class Trail(VMobject):
+    def __init__(self, points, **kwargs):
+        super().__init__(**kwargs)
+        self.trail_points = np.asarray(points, dtype = float)
+        self.set_points_as_corners(self.trail_points)
+        self.curve_points = self.points.copy()
+        self.set_n_points(len(self.trail_points))
+
+
+    # trail through the coordinates 'coords' of the axes 'ax'
+    @classmethod
+    def from_coords(cls, ax, coords, **kwargs):
+        return cls(c2p_array(ax, coords), **kwargs)
+
+
+    # returns the bezier points of the polyline from its point 'start' to its point 'end'
+    def get_curve_points(self, start, end):
+        return self.curve_points[self.n_points_per_cubic_curve*start:self.n_points_per_cubic_curve*max(end, start)]
+
+
+    # draws the trail through its first 'n_points' points
+    def set_n_points(self, n_points):
+        self.n_points = min(max(int(n_points), 1), len(self.trail_points))
+        self.set_points(self.get_curve_points(0, self.n_points - 1))
+        return self
+
+
+    # draws the fraction 'alpha' (0 to 1) of the trail
+    def set_progress(self, alpha):
+        return self.set_n_points(1 + round(alpha * (len(self.trail_points) - 1)))
+
+
+# precomputed trace through the scene points 'points' (one per frame) revealed up to the current frame, optionally only its last
+# 'tail_length' points fading out over 'n_tail_pieces' pieces of increasing opacity (constant cost per frame)
+class PhaseTrace(VGroup):
+    def __init__(self, points, tail_length = None, n_tail_pieces = 10, color = WHITE, stroke_width = 1, stroke_opacity = 0.75, **kwargs):
+        super().__init__(**kwargs)
+        self.trace = Trail(points)
+        self.tail_length = tail_length
+        if tail_length is None:
+            opacities = [stroke_opacity]
+        else:
+            opacities = np.linspace(0, stroke_opacity, n_tail_pieces + 1)[1:]
+        for opacity in opacities:
+            self.add(VMobject(stroke_color = color, stroke_width = stroke_width, stroke_opacity = opacity))
+        self.set_frame(0)
+
+
+    # trace through the coordinates 'coords' of the axes 'ax'
+    @classmethod
+    def from_coords(cls, ax, coords, **kwargs):
+        return cls(c2p_array(ax, coords), **kwargs)
+
+
+    # reveals the trace up to the point of the given 'frame'
+    def set_frame(self, frame):
+        end = min(max(int(frame), 0), len(self.trace.trail_points) - 1)
+        start = 0 if self.tail_length is None else max(end - self.tail_length, 0)
+        bounds = np.linspace(start, end, len(self.submobjects) + 1).round().astype(int)
+        for piece, piece_start, piece_end in zip(self.submobjects, bounds[:-1], bounds[1:]):
+            piece.set_points(self.trace.get_curve_points(piece_start, piece_end))
+        return self
+
+
+# tail of the last 'length' positions of a moving object drawn by a fixed pool of dots whose opacity ramp along the tail is set
+# once: the positions are kept in a ring buffer and written into the dots (newest first) in one array operation per frame
+class FadingTail(VGroup):
+    def __init__(self, length, color = WHITE, radius = 0.05, opacity = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.positions = np.zeros((length, 3))
+        self.head = 0
+        self.n_positions = 0
+        self.dot_outline = Dot(ORIGIN, radius = radius).points.copy()
+        for i in range(length):
+            dot = Dot(radius = radius, color = color, fill_opacity = opacity * (1 - i / length), stroke_width = 0)
+            dot.set_points(np.zeros((0, 3)))
+            self.add(dot)
+
+
+    # appends the next 'position' to the tail, dropping the oldest one once the tail is full
+    def push(self, position):
+        length = len(self.positions)
+        self.positions[self.head] = position
+        self.head = (self.head + 1) % length
+        self.n_positions = min(self.n_positions + 1, length)
+        ordered = self.positions[(self.head - 1 - np.arange(self.n_positions)) % length]
+        dot_points = ordered[:,np.newaxis,:] + self.dot_outline[np.newaxis]
+        for dot, points in zip(self.submobjects, dot_points):
+            dot.points = points
+        return self
+
+
+# straight line segments from the rows of 'starts' to the rows of 'ends' drawn as the subpaths of a single VMobject
+class BatchedLines(VMobject):
+    def __init__(self, starts, ends, **kwargs):
+        super().__init__(**kwargs)
+        self.set_lines(starts, ends)
+
+
+    # moves the line segments to the new 'starts' and 'ends' (one array operation for all segments)
+    def set_lines(self, starts, ends):
+        starts = np.asarray(starts, dtype = float)
+        ends = np.asarray(ends, dtype = float)
+        alphas = np.linspace(0, 1, self.n_points_per_cubic_curve)
+        points = starts[:,np.newaxis,:] + alphas[np.newaxis,:,np.newaxis] * (ends - starts)[:,np.newaxis,:]
+        self.set_points(points.reshape(-1, 3))
+        return self
+
+
+# arrows from the rows of 'starts' to the rows of 'ends' drawn as two VMobjects: all shafts as the subpaths of one, all filled triangular tips
+# as the subpaths of the other (tips of 'max_tip_length', shortened to 'max_tip_length_to_length_ratio' of the length for short arrows)
+class BatchedArrows(VGroup):
+    def __init__(self, starts, ends, max_tip_length = DEFAULT_ARROW_TIP_LENGTH, max_tip_length_to_length_ratio = 0.25, color = WHITE, stroke_width = 2, opacity = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.max_tip_length = max_tip_length
+        self.max_tip_length_to_length_ratio = max_tip_length_to_length_ratio
+        self.shafts = BatchedLines(np.zeros((0, 3)), np.zeros((0, 3)), stroke_color = color, stroke_width = stroke_width, stroke_opacity = opacity)
+        self.tips = VMobject(fill_color = color, fill_opacity = opacity, stroke_width = 0)
+        self.add(self.shafts, self.tips)
+        self.set_arrows(starts, ends)
+
+
+    # moves the arrows to the new 'starts' and 'ends' (one array operation for all shafts and one for all tips)
+    def set_arrows(self, starts, ends):
+        starts = np.asarray(starts, dtype = float)
+        ends = np.asarray(ends, dtype = float)
+        vectors = ends - starts
+        lengths = np.linalg.norm(vectors, axis = 1, keepdims = True)
+        directions = np.divide(vectors, lengths, out = np.zeros_like(vectors), where = lengths > 0)
+        normals = np.column_stack((-directions[:,1], directions[:,0], np.zeros(len(directions))))
+        tip_lengths = np.minimum(self.max_tip_length, self.max_tip_length_to_length_ratio * lengths)
+        backs = ends - tip_lengths * directions
+        self.shafts.set_lines(starts, backs)
+
+        # tips: closed triangles (tip, back left, back right, tip) with every edge as one straight cubic curve
+        corners = np.stack((ends, backs + tip_lengths/2 * normals, backs - tip_lengths/2 * normals, ends), axis = 1)
+        alphas = np.linspace(0, 1, self.tips.n_points_per_cubic_curve)[np.newaxis,np.newaxis,:,np.newaxis]
+        points = corners[:,:-1,np.newaxis,:] + alphas * (corners[:,1:] - corners[:,:-1])[:,:,np.newaxis,:]
+        self.tips.set_points(points.reshape(-1, 3))
+        return self
+
+
+# dots of the given 'radius' at the rows of 'positions' drawn as the subpaths of a single VMobject
+class BatchedDots(VMobject):
+    def __init__(self, positions, radius = DEFAULT_DOT_RADIUS, color = WHITE, fill_opacity = 1, **kwargs):
+        super().__init__(fill_color = color, fill_opacity = fill_opacity, stroke_width = 0, **kwargs)
+        self.dot_outline = Dot(ORIGIN, radius = radius).points.copy()
+        self.set_positions(positions)
+
+
+    # moves the dots to the new 'positions' (one array operation for all dots)
+    def set_positions(self, positions):
+        positions = np.asarray(positions, dtype = float)
+        self.set_points((positions[:,np.newaxis,:] + self.dot_outline[np.newaxis]).reshape(-1, 3))
+        return self
+
+
+# spring from 'start' to 'end' zig-zagging over 'nodes' nodes with deviance 'k' between two straight tips of length 'tip_buff', built
+# once as one polyline and one set of node dots whose points are recomputed in place when the spring is moved
+class Spring(VGroup):
+    def __init__(self, start = UP, end = DOWN, tip_buff = 0.25, nodes = 20, k = 0.5, color = WHITE, stroke_width = 4, **kwargs):
+        super().__init__(**kwargs)
+        self.tip_buff = tip_buff
+        self.k = k
+
+        # zig-zag pattern: position along the spring (in node lengths) and side (+1 / -1) of every node
+        node_i = np.arange(1, nodes + 1)
+        self.node_steps = node_i - 1/2
+        self.node_sides = (-1.0)**(node_i + 1)
+
+        self.line = VMobject(stroke_color = color, stroke_width = stroke_width, stroke_opacity = 0.5)
+        self.dots = BatchedDots(np.zeros((0, 3)), radius = 0.02, color = color)
+        self.add(self.line, self.dots)
+        self.put_start_and_end_on(start, end)
+
+
+    # returns the vertices of the spring: start, start of the zig-zag, its nodes, end of the zig-zag and end (projected onto z = 0)
+    def get_vertices(self, start, end):
+        start = np.array([start[0], start[1], 0], dtype = float)
+        end = np.array([end[0], end[1], 0], dtype = float)
+        direction = (end - start) / np.linalg.norm(end - start)
+        anti_direction = np.array([direction[1], -direction[0], direction[2]])
+        eff_start = start + self.tip_buff * direction
+        eff_end = end - self.tip_buff * direction
+        node_length = np.linalg.norm(eff_end - eff_start) / len(self.node_steps)
+        nodes = eff_start + np.outer(self.node_steps * node_length, direction) + np.outer(self.node_sides * self.k / 2, anti_direction)
+        return np.vstack((start, eff_start, nodes, eff_end, end))
+
+
+    # moves the spring to span from 'start' to 'end'
+    def put_start_and_end_on(self, start, end):
+        vertices = self.get_vertices(start, end)
+        self.line.set_points_as_corners(vertices)
+        self.dots.set_positions(vertices[1:-1])
+        return self
+
+
+# point cloud of the scene points 'points' drawn pixel by pixel as a single PMobject, revealed up to any number of its points
+class PointCloud(PMobject):
+    def __init__(self, points, color = WHITE, stroke_width = 2, opacity = 1, **kwargs):
+        super().__init__(stroke_width = stroke_width, **kwargs)
+        self.add_points(np.asarray(points, dtype = float), color = color, alpha = opacity)
+        self.cloud_points = self.points.copy()
+        self.cloud_rgbas = self.rgbas.copy()
+
+
+    # point cloud of the coordinates 'coords' of the axes 'ax'
+    @classmethod
+    def from_coords(cls, ax, coords, **kwargs):
+        return cls(c2p_array(ax, coords), **kwargs)
+
+
+    # draws the first 'n_points' points of the cloud
+    def set_n_points(self, n_points):
+        n_points = min(max(int(n_points), 0), len(self.cloud_points))
+        self.points = self.cloud_points[:n_points]
+        self.rgbas = self.cloud_rgbas[:n_points]
+        return self
+
+
+    # moves the points of the cloud to the new 'positions' (one row per point), keeping the number of drawn points
+    def set_positions(self, positions):
+        self.cloud_points = np.array(positions, dtype = float)
+        return self.set_n_points(len(self.points))
+
+
+# raster image of the log-scaled density of the scene points 'points' binned into 'bins' = (n_x, n_y) pixels over the scene rectangle
+# 'x_range' x 'y_range' (rendering cost independent of the number of points, more points can be added later on)
+class DensityImage(ImageMobject):
+    def __init__(self, points, x_range, y_range, bins = (1024, 512), color = WHITE, **kwargs):
+        self.density_x_range = x_range
+        self.density_y_range = y_range
+        self.density_bins = bins
+        self.density_rgb = np.round(255 * color_to_rgb(color))
+        self.counts = np.zeros((bins[1], bins[0]))
+        super().__init__(self.get_density_pixel_array(), **kwargs)
+        self.stretch_to_fit_width(x_range[1] - x_range[0]).stretch_to_fit_height(y_range[1] - y_range[0])
+        self.move_to([(x_range[0] + x_range[1]) / 2, (y_range[0] + y_range[1]) / 2, 0])
+        self.add_density_points(points)
+
+
+    # density image of the coordinates 'coords' of the (2D) axes 'ax' spanning 'x_range' x 'y_range' of these axes
+    @classmethod
+    def from_coords(cls, ax, coords, x_range, y_range, **kwargs):
+        lower_left, upper_right = ax.c2p(x_range[0], y_range[0]), ax.c2p(x_range[1], y_range[1])
+        return cls(c2p_array(ax, coords), (lower_left[0], upper_right[0]), (lower_left[1], upper_right[1]), **kwargs)
+
+
+    # returns the RGBA pixel array: the color with the density as its opacity
+    def get_density_pixel_array(self):
+        pixel_array = np.zeros(self.counts.shape + (4,), dtype = np.uint8)
+        pixel_array[:,:,:3] = self.density_rgb
+        pixel_array[:,:,3] = np.round(255 * log_density(self.counts))
+        return pixel_array
+
+
+    # bins further scene points into the image
+    def add_density_points(self, points):
+        points = np.asarray(points)
+        histogram_2d(points[:,0], points[:,1], self.density_x_range, self.density_y_range, self.density_bins, counts = self.counts)
+        self.pixel_array[:] = self.get_density_pixel_array()
+        return self
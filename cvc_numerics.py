@@ -0,0 +1,210 @@
+import numpy as np
+
+
+# numerical integration of ordinary differential equations (the methods of cvc_numerics.c) on batched state arrays 'y' of shape
+# (n_systems, dimension): the ode 'func(t, y, params)' returns the derivative of all systems at once as an array of the same shape, every
+# step advances all systems in one vectorized operation and updates 'y' in place
+
+
+# euler step of the state array y
+def euler_step(t, delta_t, y, func, params = None):
+    y += func(t, y, params) * delta_t
+    return y
+
+
+# runge-kutta step of 2nd order of the state array y
+def rk2_step(t, delta_t, y, func, params = None):
+    k1 = func(t, y, params) * delta_t                                   # k1 = f(t, y) * dt
+    k2 = func(t + delta_t/2, y + k1/2, params) * delta_t                # k2 = f(t+dt/2, y+k1/2) * dt
+    y += k2
+    return y
+
+
+# runge-kutta step of 4th order of the state array y
+def rk4_step(t, delta_t, y, func, params = None):
+    k1 = func(t, y, params) * delta_t                                   # k1 = f(t, y) * dt
+    k2 = func(t + delta_t/2, y + k1/2, params) * delta_t                # k2 = f(t+dt/2, y+k1/2) * dt
+    k3 = func(t + delta_t/2, y + k2/2, params) * delta_t                # k3 = f(t+dt/2, y+k2/2) * dt
+    k4 = func(t + delta_t, y + k3, params) * delta_t                    # k4 = f(t+dt, y+k3) * dt
+    y += (k1 + 2*k2 + 2*k3 + k4) / 6
+    return y
+
+
+# verlet step of the state array y (first half of the last axis: positions, second half: velocities)
+def verlet_step(t, delta_t, y, func, params = None):
+    N = y.shape[-1] // 2
+    a1 = func(t, y, params)                                             # a1 = f(t, y)
+    y[...,:N] += a1[...,:N] * delta_t + a1[...,N:] * delta_t**2 / 2     # positions of y_(i+1) from a1
+    a2 = func(t + delta_t, y, params)                                   # a2 = f(t+dt, y_(i+1)) from the positions of y_(i+1)
+    y[...,N:] += (a1[...,N:] + a2[...,N:]) * delta_t / 2                # velocities of y_(i+1) from a1 and a2
+    return y
+
+
+# velocity verlet step of the state array y (first half of the last axis: positions, second half: velocities)
+def verlet_step2(t, delta_t, y, func, params = None):
+    N = y.shape[-1] // 2
+    y[...,N:] += func(t, y, params)[...,N:] * delta_t / 2               # half step of the velocities with the forces at t
+    y[...,:N] += y[...,N:] * delta_t                                    # full step of the positions with the updated velocities
+    y[...,N:] += func(t + delta_t, y, params)[...,N:] * delta_t / 2     # half step of the velocities with the forces at t+dt
+    return y
+
+
+# integrates the initial states 'y0' (n_systems, dimension) of the ode 'func' from 't_start' to 't_end' with the integration 'step' and
+# returns the times and the states (dim 0: time, dim 1: system, dim 2: dimension) of every 'stride'-th time step
+def integrate(step, func, y0, t_start, t_end, delta_t, params = None, stride = 1):
+    y = np.array(y0, dtype = float, ndmin = 2)
+    n_steps = int(round((t_end - t_start) / delta_t))
+    t_array = t_start + delta_t * np.arange(0, n_steps + 1, stride)
+    y_array = np.empty((len(t_array),) + y.shape)
+    y_array[0] = y
+    for step_i in range(1, n_steps + 1):
+        step(t_start + (step_i - 1) * delta_t, delta_t, y, func, params)
+        if step_i % stride == 0:
+            y_array[step_i // stride] = y
+    return t_array, y_array
+
+
+# weights of the symplectic compositions of yoshida (4th and 6th order, solution A) of the 2nd order velocity verlet step
+yoshida4_weights = np.array([1, -2**(1/3), 1]) / (2 - 2**(1/3))
+yoshida6_w = np.array([-1.17767998417887, 0.235573213359357, 0.784513610477560])
+yoshida6_weights = np.concatenate((yoshida6_w[::-1], [1 - 2 * np.sum(yoshida6_w)], yoshida6_w))
+
+
+# symplectic step of the state array y (first half of the last axis: positions, second half: velocities) composed of velocity verlet
+# substeps of the sizes 'weights' * delta_t, the closing half kick of every substep merged with the opening half kick of the next one
+# (one evaluation of func per substep and one more per step)
+def composition_step(t, delta_t, y, func, params = None, weights = (1,)):
+    N = y.shape[-1] // 2
+    h_array = np.asarray(weights) * delta_t
+    kick_array = (h_array + np.append(h_array[1:], 0)) / 2                # merged kicks after every drift, the last one a half kick
+    y[...,N:] += func(t, y, params)[...,N:] * h_array[0] / 2
+    for h, kick in zip(h_array, kick_array):
+        y[...,:N] += y[...,N:] * h
+        t += h
+        y[...,N:] += func(t, y, params)[...,N:] * kick
+    return y
+
+
+# symplectic step of 4th order (yoshida)
+def yoshida4_step(t, delta_t, y, func, params = None):
+    return composition_step(t, delta_t, y, func, params, yoshida4_weights)
+
+
+# symplectic step of 6th order (yoshida)
+def yoshida6_step(t, delta_t, y, func, params = None):
+    return composition_step(t, delta_t, y, func, params, yoshida6_weights)
+
+
+# time-transformed symplectic step (logarithmic hamiltonian leapfrog, regularizing close encounters) of the state array y over the
+# fictitious time 'delta_s', composed of substeps of the sizes 'weights' * delta_s: the drifts advance the positions by the physical time
+# delta_s / (T + B) and the kicks the velocities by delta_s / U, with the kinetic energy T = 'kinetic_energy(y)', the (positive) potential
+# U = 'potential_energy(y)' and the constant B = -E of every system; returns the physical times 't' (n_systems) and the state array y,
+# both updated in place
+def logh_step(t, delta_s, y, func, params, kinetic_energy, potential_energy, binding_energy, weights = (1,)):
+    N = y.shape[-1] // 2
+    for weight in weights:
+        h = weight * delta_s
+        delta_t = h / 2 / (kinetic_energy(y) + binding_energy)
+        y[...,:N] += delta_t[:,np.newaxis] * y[...,N:]
+        t += delta_t
+        y[...,N:] += (h / potential_energy(y))[:,np.newaxis] * func(t, y, params)[...,N:]
+        delta_t = h / 2 / (kinetic_energy(y) + binding_energy)
+        y[...,:N] += delta_t[:,np.newaxis] * y[...,N:]
+        t += delta_t
+    return t, y
+
+
+# butcher tableau of the embedded runge-kutta method of dormand-prince (5th order solution, 4th order error estimate) and the coefficients
+# of its 4th order continuous extension (dense output)
+dopri_c = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+dopri_a = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+dopri_b = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+dopri_e = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+dopri_p = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+
+# adaptive dormand-prince step of the state array y from t with the trial step size 'delta_t' and the derivative 'f' = func(t, y): the
+# step size is reduced until the estimated error (rms over all systems, relative 'rtol' / absolute 'atol') is below 1, returns the
+# accepted step size, the stages k (7, n_systems, dimension) and the proposed next step size; y is updated in place, k[6] = func(t+h, y)
+# (a RuntimeError once the step size no longer advances t)
+def rk45_step(t, delta_t, y, func, f, params = None, rtol = 1e-8, atol = 1e-10):
+    k = np.empty((7,) + y.shape)
+    k[0] = f
+    while True:
+        if t + delta_t == t:
+            raise RuntimeError(f"step size underflow at t={t}")
+        for stage in range(1, 6):
+            k[stage] = func(t + dopri_c[stage] * delta_t, y + delta_t * np.tensordot(dopri_a[stage], k[:stage], axes = 1), params)
+        y_new = y + delta_t * np.tensordot(dopri_b[:6], k[:6], axes = 1)
+        k[6] = func(t + delta_t, y_new, params)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error = np.sqrt(np.mean((delta_t * np.tensordot(dopri_e, k, axes = 1) / scale)**2))
+        factor = 10 if error == 0 else min(10, max(0.2, 0.9 * error**(-1/5)))
+        if error <= 1:
+            y[...] = y_new
+            return delta_t, k, delta_t * factor
+        delta_t *= max(0.2, 0.9 * error**(-1/5))
+
+
+# returns the states of the dense output of the step from 't' with step size 'delta_t', state 'y_old' and stages 'k' at the times 't_dense'
+def rk45_dense_output(t, delta_t, y_old, k, t_dense):
+    x = (np.asarray(t_dense) - t) / delta_t
+    q = np.tensordot(dopri_p.T, k, axes = 1)                            # polynomial coefficients (4, n_systems, dimension)
+    powers = np.cumprod(np.repeat(x[:,np.newaxis], 4, axis = 1), axis = 1)
+    return y_old + delta_t * np.tensordot(powers, q, axes = 1)
+
+
+# returns the first trial step size for the state array y with the derivative 'f' = func(t, y): 1% of the ratio of the scaled (rms over
+# all systems, relative 'rtol' / absolute 'atol') norms of y and f, or 1e-6 if either of them is tiny (as in an initial state at rest)
+def get_initial_step(y, f, rtol = 1e-8, atol = 1e-10):
+    scale = atol + rtol * np.abs(y)
+    y_norm = np.sqrt(np.mean((y / scale)**2))
+    f_norm = np.sqrt(np.mean((f / scale)**2))
+    if y_norm < 1e-5 or f_norm < 1e-5:
+        return 1e-6
+    return 0.01 * y_norm / f_norm
+
+
+# integrates the initial states 'y0' (n_systems, dimension) of the ode 'func' from 't_start' with adaptive dormand-prince steps (error
+# control by 'rtol' and 'atol', at most 'max_step') and returns the states at the sorted times 't_eval' (dim 0: time, dim 1: system,
+# dim 2: dimension) from the dense output of the steps covering them, as well as the number of accepted steps
+def integrate_adaptive(func, y0, t_start, t_eval, params = None, rtol = 1e-8, atol = 1e-10, max_step = np.inf, delta_t = None):
+    y = np.array(y0, dtype = float, ndmin = 2)
+    t_eval = np.asarray(t_eval, dtype = float)
+    y_array = np.empty((len(t_eval),) + y.shape)
+    t = t_start
+    f = func(t, y, params)
+    if delta_t is None:
+        delta_t = get_initial_step(y, f, rtol, atol)
+    eval_i = np.searchsorted(t_eval, t_start, side = "right")
+    y_array[:eval_i] = y
+    n_steps = 0
+    while eval_i < len(t_eval):
+        y_old = y.copy()
+        delta_t, k, delta_t_next = rk45_step(t, min(delta_t, max_step), y, func, f, params, rtol, atol)
+        n_steps += 1
+
+        # frames covered by the step, sampled from its dense output
+        eval_end = np.searchsorted(t_eval, t + delta_t, side = "right")
+        if eval_end > eval_i:
+            y_array[eval_i:eval_end] = rk45_dense_output(t, delta_t, y_old, k, t_eval[eval_i:eval_end])
+            eval_i = eval_end
+        t += delta_t
+        f = k[6]
+        delta_t = delta_t_next
+    return y_array, n_steps
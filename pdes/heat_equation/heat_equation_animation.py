@@ -1,15 +1,11 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
 
 
-# data processing
-heat_data = np.loadtxt("data/heat_equation_data.csv", delimiter = ",", skiprows = 0)
-
-x_array = heat_data[0,:]
-heat_iter_list = []
-
-# iter generation
-for i in range(len(x_array)):
-    heat_iter_list.append(iter(heat_data[1::10,i]))
+# animation speed (every 'animation_speed'-th time step is rendered)
+animation_speed = 10
 
 
 class heat_equation_scene(Scene):
@@ -23,6 +19,11 @@ class heat_equation_scene(Scene):
         text_heat = Title(r"Heat Equation", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(RIGHT)
         self.add(text_heat)
 
+        # lazily opened data: positions in the first row, the time steps below (header-less file)
+        x_array = Dataset("data/heat_equation_data.csv", skiprows = 0)[0]
+        heat_data = Dataset("data/heat_equation_data.csv", stride = animation_speed, start = 1, skiprows = 0)
+        heat_iter = heat_data.iter_rows()
+
         # heat sources
         left_source = Circle(radius = 1.0, color = RED, fill_opacity = 0.5).move_to([-5.5, 0, -1])
         right_source = Circle(radius = 1.0, color = BLUE, fill_opacity = 0.5).move_to([5.5, 0, -1])
@@ -34,8 +35,7 @@ class heat_equation_scene(Scene):
 
         # initial heat elementes of the rode
         T_line_list = []
-        for i, heat_iter in enumerate(heat_iter_list):
-            T = next(heat_iter)
+        for i, T in enumerate(next(heat_iter)):
             if T > 0:
                 T_line = Line(start = [(-0.5 + x_array[i]) * 10, -0.75/2, 0], end = [(-0.5 + x_array[i]) * 10, 0.75/2, 0], color = RED, stroke_opacity = T)
             else:
@@ -45,8 +45,7 @@ class heat_equation_scene(Scene):
 
         # heat elements updater
         def T_updater(Rode):
-            for i, heat_iter in enumerate(heat_iter_list):
-                T = next(heat_iter)
+            for i, T in enumerate(next(heat_iter)):
                 if T > 0:
                     T_line_list[i].become(Line(start = [(-0.5 + x_array[i]) * 10, -0.75/2, 0], end = [(-0.5 + x_array[i]) * 10, 0.75/2, 0], color = RED, stroke_opacity = T))
                 else:
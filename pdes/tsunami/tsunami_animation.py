@@ -1,4 +1,7 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
 
 
 # ocean parameters
@@ -32,13 +35,9 @@ def height_ocean(x):
 # data processing
 riff_x_plot = np.linspace(OCEAN_X_LEFT, OCEAN_X_RIGHT-1, 1000)
 riff_h_plot = np.array([5000 - height_ocean(riff_x_plot_i) for riff_x_plot_i in riff_x_plot]) 
-tsunami_data = np.loadtxt("data/tsunami_data.csv", delimiter = ",", skiprows = 0)
-x_ocean_array = tsunami_data[0,1:] / 1000
-wave_iter_list = []
 
-# iter generation
-for i in range(1, len(x_ocean_array)+1):
-    wave_iter_list.append(iter(tsunami_data[1::10,i]))
+# animation speed (every 'animation_speed'-th time step is rendered)
+animation_speed = 10
 
 
 class tsunami_scene(Scene):
@@ -51,6 +50,11 @@ class tsunami_scene(Scene):
         text_heat = Title(r"1D-d'Alembert Equation", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.75 * RIGHT)
         self.add(text_heat)
 
+        # lazily opened data: ocean positions in the first row, the time steps below (header-less file)
+        x_ocean_array = Dataset("data/tsunami_data.csv", skiprows = 0)[0,1:] / 1000
+        tsunami_data = Dataset("data/tsunami_data.csv", stride = animation_speed, start = 1, skiprows = 0)
+        wave_iter = tsunami_data.iter_rows(slice(1, None))
+
         # riff: coordinate system
         x_riff_range = [OCEAN_X_LEFT, OCEAN_X_RIGHT, 50]
         y_riff_range = [0, OCEAN_HEIGHT, 1000]
@@ -91,9 +95,8 @@ class tsunami_scene(Scene):
 
         # wave
         wave_line_list = []
-        for i, wave_iter in enumerate(wave_iter_list):
+        for i, y_wave in enumerate(next(wave_iter)):
             x_wave = x_ocean_array[i]
-            y_wave = next(wave_iter)
             if y_wave > -OCEAN_HEIGHT_RIFF:
                 wave_line = Line(start = ax_wave.c2p(x_wave, y_wave, 0), end = ax_wave.c2p(x_wave, -20, 0), color = BLUE, stroke_opacity = 0.3)
             wave_line_list.append(wave_line)
@@ -101,9 +104,8 @@ class tsunami_scene(Scene):
 
         # wave updater
         def wave_updater(wave):
-            for i, wave_iter in enumerate(wave_iter_list):
+            for i, y_wave in enumerate(next(wave_iter)):
                 x_wave = x_ocean_array[i]
-                y_wave = next(wave_iter)
                 if y_wave > -OCEAN_HEIGHT_RIFF:
                     wave_line = Line(start = ax_wave.c2p(x_wave, y_wave, 0), end = ax_wave.c2p(x_wave, -20, 0), color = BLUE, stroke_opacity = 0.3)
                 wave_line_list[i].become(wave_line)
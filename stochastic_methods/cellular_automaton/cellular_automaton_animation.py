@@ -1,29 +1,85 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
 
 
 # global grid parameters
 GRID_CENTER = np.array([-3, -0.5, 0])
 GRID_SIDE_LENGTH = 5.5
-GRID_L = 96
-GRID_NODE_DIST = GRID_SIDE_LENGTH / (GRID_L + 1)
+GRID_RESOLUTION = 1024                          # approximate number of pixels along the side of the rendered grid
+STATE_COLORS = [GREY, WHITE, RED, BLUE]         # colors of the node states -1 (V), 0 (S), 1 (I) and 2 (R)
 
+# animation parameters
+n_time_steps = 100                              # number of rendered time steps (up to T = 1000 of cellular_automaton.c)
+update_mode = "diff"                            # "diff": only the changed nodes are redrawn, "full": the whole grid is redrawn
 
-# get grid coordinates for given row i and column j
-def get_grid_coordinates(i_row, j_colum):
-    grid_top_left_node = GRID_CENTER + np.array([-GRID_SIDE_LENGTH / 2 + GRID_NODE_DIST, GRID_SIDE_LENGTH / 2 - GRID_NODE_DIST, 0])
-    return grid_top_left_node + np.array([j_colum, -i_row, 0])  * GRID_NODE_DIST
 
+# returns the side length L of the square grids stored in the given data set (one time step per row, first column: time)
+def get_grid_L(grid_data):
+    return int(round(np.sqrt(grid_data.data.shape[1] - 1)))
 
-# data processing
-soi_grid_over_time_data_a = np.loadtxt("data/soi_grid_over_time_a.csv", delimiter = ",", skiprows = 0)
-soi_grid_over_time_data_b = np.loadtxt("data/soi_grid_over_time_b.csv", delimiter = ",", skiprows = 0)
-soi_grid_over_time_data_c = np.loadtxt("data/soi_grid_over_time_c.csv", delimiter = ",", skiprows = 0)
 
-# reshape data array (dim 0: time, dim 1: rows, dim 2: columns) and remove time column 1
-time_array = soi_grid_over_time_data_b[:,0]
-soi_grid_over_time_array_a = np.reshape(soi_grid_over_time_data_a[:,1:], (1001, GRID_L, GRID_L))
-soi_grid_over_time_array_b = np.reshape(soi_grid_over_time_data_b[:,1:], (1001, GRID_L, GRID_L))
-soi_grid_over_time_array_c = np.reshape(soi_grid_over_time_data_c[:,1:], (1001, GRID_L, GRID_L))
+# returns the grid (dim 0: rows, dim 1: columns) at time step t of the given data set (removing the time column)
+def get_grid(grid_data, t, grid_L):
+    return np.reshape(grid_data[t,1:], (grid_L, grid_L)).astype(int)
+
+
+# returns the RGBA pixel tiles (dim 0: node state + 1) of 'tile_size' x 'tile_size' pixels: half transparent squares with an opaque border
+# (if there is room for it) and an additional cross for vaccinated nodes
+def make_state_tiles(tile_size):
+    tiles = np.zeros((len(STATE_COLORS), tile_size, tile_size, 4), dtype = np.uint8)
+    border = np.ones((tile_size, tile_size), dtype = bool)
+    border[1:-1,1:-1] = False
+    diagonal = np.arange(tile_size)
+    for state_i, color in enumerate(STATE_COLORS):
+        tiles[state_i,:,:,:3] = np.round(255 * color_to_rgb(color))
+        tiles[state_i,:,:,3] = 128
+        if tile_size >= 4:
+            tiles[state_i,border,3] = 255
+    if tile_size >= 4:
+        tiles[0,diagonal,diagonal,3] = 255
+        tiles[0,diagonal,tile_size-1-diagonal,3] = 255
+    return tiles
+
+
+# raster image of an L x L grid of node states, each node drawn as a pixel tile looked up by its state (one array operation per grid)
+class GridImage(ImageMobject):
+    def __init__(self, grid_array, center = GRID_CENTER, side_length = GRID_SIDE_LENGTH, resolution = GRID_RESOLUTION, **kwargs):
+        self.grid_L = grid_array.shape[0]
+        self.tile_size = max(resolution // self.grid_L, 1)
+        self.tiles = make_state_tiles(self.tile_size)
+        self.grid_array = np.array(grid_array)
+        super().__init__(self.grid_to_pixel_array(grid_array), **kwargs)
+        self.set_resampling_algorithm(RESAMPLING_ALGORITHMS["nearest"])
+
+        # the nodes fill the grid square up to a margin of half a node distance
+        node_dist = side_length / (self.grid_L + 1)
+        self.stretch_to_fit_height(self.grid_L * node_dist).stretch_to_fit_width(self.grid_L * node_dist).move_to(center)
+
+
+    # converts the grid array into the RGBA pixel array (rows of tiles)
+    def grid_to_pixel_array(self, grid_array):
+        L, size = self.grid_L, self.tile_size
+        return self.tiles[grid_array + 1].transpose(0, 2, 1, 3, 4).reshape(L * size, L * size, 4)
+
+
+    # redraws the image for the given grid array, returns the number of changed nodes
+    def set_grid(self, grid_array):
+        n_changed = np.count_nonzero(grid_array != self.grid_array)
+        self.pixel_array[:] = self.grid_to_pixel_array(grid_array)
+        self.grid_array = np.array(grid_array)
+        return n_changed
+
+
+    # redraws only the tiles of the nodes that changed since the last grid array, returns their number
+    def update_grid(self, grid_array):
+        L, size = self.grid_L, self.tile_size
+        row_i, column_j = np.nonzero(grid_array != self.grid_array)
+        tile_view = self.pixel_array.reshape(L, size, L, size, 4)             # view: (tile row, pixel row, tile column, pixel column, RGBA)
+        tile_view[row_i,:,column_j] = self.tiles[grid_array[row_i, column_j] + 1]
+        self.grid_array[row_i, column_j] = grid_array[row_i, column_j]
+        return len(row_i)
 
 
 # main scene
@@ -35,6 +91,10 @@ class cellular_automaton_scene(Scene):
         # headline
         headline = Title(r"Model for the Spread of Infectious Diseases", font_size = 48).align_on_border(UP + LEFT, buff = 0.5).shift(0.5 * RIGHT)
 
+        # lazily opened grid data (header-less file, one time step per row)
+        grid_data = Dataset("data/soi_grid_over_time_c.csv", skiprows = 0)
+        grid_L = get_grid_L(grid_data)
+
         # legend
         square_susceptible = Square(color = WHITE, fill_opacity = 0.5, side_length = 0.3, stroke_width = 1).move_to([2, 2.1, 0])
         square_infected = Square(color = RED, fill_opacity = 0.5, side_length = 0.3, stroke_width = 1).move_to([2, 1.35, 0])
@@ -58,31 +118,10 @@ class cellular_automaton_scene(Scene):
 
         # main infection grid
         main_grid = Square(color = WHITE, side_length = GRID_SIDE_LENGTH, stroke_width = 0.5).move_to(GRID_CENTER)
-        main_L = Tex(f"$L=96$", color = WHITE, font_size = 24).move_to([-5, 2.45, 0])
+        main_L = Tex(f"$L={grid_L}$", color = WHITE, font_size = 24).move_to([-5, 2.45, 0])
         main_T = Tex(f"$t=0$", color = WHITE, font_size = 24).move_to([-1, 2.45, 0])
-
-        # gridmaker for given 3D array and time t
-        def make_grid_from_array(grid_array, t):
-            grid_total_group = VGroup()
-            for i_row in range(96):
-                for j_column in range(96):
-                    node_status = grid_array[t, i_row, j_column]
-                    node_position = get_grid_coordinates(i_row, j_column)
-                    if node_status == -1:
-                        grid_node = Square(color = GREY, fill_opacity = 0.5, side_length = GRID_NODE_DIST, stroke_width = 1).move_to(node_position)
-                        grid_node_cross = Cross(stroke_color = GREY, stroke_width = 1, scale_factor = GRID_NODE_DIST / 2).move_to(node_position)
-                        grid_total_group.add(grid_node, grid_node_cross)
-                    elif node_status == 0:
-                        grid_node = Square(color = WHITE, fill_opacity = 0.5, side_length = GRID_NODE_DIST, stroke_width = 1).move_to(node_position)
-                        grid_total_group.add(grid_node)                  
-                    elif node_status == 1:
-                        grid_node = Square(color = RED, fill_opacity = 0.5, side_length = GRID_NODE_DIST, stroke_width = 1).move_to(node_position)
-                        grid_total_group.add(grid_node)
-                    elif node_status == 2:
-                        grid_node = Square(color = BLUE, fill_opacity = 0.5, side_length = GRID_NODE_DIST, stroke_width = 1).move_to(node_position)
-                        grid_total_group.add(grid_node)
-            return grid_total_group
-
+        text_changed = Tex(r"changed nodes:", color = WHITE, font_size = 24).move_to([-3.3, 2.45, 0])
+        main_changed = Integer(0, color = WHITE, font_size = 24).next_to(text_changed, direction = RIGHT, buff = 0.15)
 
         # adding objects
         # self.add(headline)
@@ -92,27 +131,34 @@ class cellular_automaton_scene(Scene):
         # self.play(Create(main_grid), Write(main_L), Write(main_T), run_time = 1.5)
         # self.wait(1.5)
         # ### total grid, t = 0 ###
-        # total_grid = make_grid_from_array(soi_grid_over_time_array_b, 0)
-        # self.play(Create(total_grid), run_time = 5)
+        # total_grid = GridImage(get_grid(grid_data, 0, grid_L))
+        # self.play(FadeIn(total_grid), run_time = 5)
         # self.wait(0.5)
         # self.play(Create(rectange_probabilities), Write(text_probabilities), run_time = 1.5)
         # self.play(FadeIn(probability_legend_group), run_time = 3)
         # self.wait(1.5)
 
         # add everything at once
-        self.add(headline, legend_group, main_grid, main_T, rectange_probabilities, text_probabilities, text_probabilities, probability_legend_group, main_L)
+        self.add(headline, legend_group, main_grid, main_T, rectange_probabilities, text_probabilities, text_probabilities, probability_legend_group, main_L, text_changed, main_changed)
         # # ### total grid, t = 0 ###
-        total_grid = make_grid_from_array(soi_grid_over_time_array_c, 0)
+        total_grid = GridImage(get_grid(grid_data, 0, grid_L))
         self.add(total_grid)
         self.wait(1.5)
         ### total grid t ###
-        for t in range(1, 101):
-            self.remove(total_grid)
-            total_grid = make_grid_from_array(soi_grid_over_time_array_c, t)
-            self.add(total_grid)
+        n_changed = np.zeros(min(n_time_steps, len(grid_data) - 1) + 1, dtype = int)      # changed nodes per time step
+        for t in range(1, len(n_changed)):
+            if update_mode == "diff":
+                n_changed[t] = total_grid.update_grid(get_grid(grid_data, t, grid_L))
+            else:
+                n_changed[t] = total_grid.set_grid(get_grid(grid_data, t, grid_L))
+            main_changed.set_value(n_changed[t])
             if t % 10 == 0:
                 self.remove(main_T)
                 main_T = Tex(f"$t={t}$", color = WHITE, font_size = 24).move_to([-1, 2.45, 0])
                 self.add(main_T)
             self.wait(1/5)
-        self.wait(5)
\ No newline at end of file
+
+        # summary of the changed nodes per time step
+        text_changed_summary = Tex(f"changed nodes per step: mean ${np.mean(n_changed[1:]):.1f}$, max ${np.max(n_changed)}$ of ${grid_L**2}$", color = WHITE, font_size = 24).move_to([-3, -3.6, 0])
+        self.add(text_changed_summary)
+        self.wait(5)
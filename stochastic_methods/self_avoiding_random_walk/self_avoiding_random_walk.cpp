@@ -1,5 +1,6 @@
 #include <iostream>
 #include <fstream>
+#include <string>
 #include <time.h>
 #include <cmath>
 
@@ -39,6 +40,10 @@ typedef struct {
 } grid;
 
 
+// ensemble of polymers grown from the seeds 0 to 'N_ensemble'-1, all written into one file with the polymer (seed) as the first column
+const int N_ensemble = 100000;                                                  // number of polymers in the ensemble
+
+
 // returns the state of a new monomer according to the probability of a polar monomer 'p_polar'
 node_state get_state(double p_polar) {
     double rand_uniform = (double) rand() / RAND_MAX;
@@ -88,7 +93,7 @@ node_direction get_grid_direction() {
 
 
 // function to add monomer to the polymer grid
-int grid_add_monomer(grid *polymer_grid, double p_polar, double epsilon, std::ofstream *outfile = NULL) {
+int grid_add_monomer(grid *polymer_grid, double p_polar, double epsilon, std::ofstream *outfile = NULL, int polymer = -1) {
     int prior_m = polymer_grid->prior.m;                                        // get the m position of the previous node
     int prior_n = polymer_grid->prior.n;                                        // get the n position of the previous node
     int m = polymer_grid->end.m;                                                // get the m position of the current ending
@@ -123,6 +128,9 @@ int grid_add_monomer(grid *polymer_grid, double p_polar, double epsilon, std::of
 
     // write new monomer and energy to file in case
     if (outfile) {
+        if (polymer >= 0) {
+            *outfile << polymer << ", ";                                        // polymer of the ensemble the monomer belongs to
+        }
         *outfile << m-1 << ", " << n-1 << ", " << next_state << ", " << polymer_grid->energy << "\n";
     }
 
@@ -194,8 +202,27 @@ void grid_print(grid* polymer_grid) {
 }
 
 
-// generating 3 protein samples
-int main(void) {
+// generates the ensemble of 'N_ensemble' proteins, one per seed 1 to 'N_ensemble' (srand(0) and srand(1) give the same sequence), into one file
+int protein_folding_ensemble(double p_polar, double epsilon) {
+    std::ofstream *outfile_ensemble = new std::ofstream;
+    outfile_ensemble->open("data/protein_folding_ensemble.csv");
+    *outfile_ensemble << "polymer, m, n, Node Status, Energy E\n";
+
+    grid *protein_grid = new grid;                                              // allocate struct grid memory once for all polymers
+    for (int polymer = 0; polymer < N_ensemble; polymer++) {
+        srand (polymer + 1);
+        grid_init(protein_grid);                                                // reset the polypeptide grid with borders and empty nodes
+        do {} while(!grid_add_monomer(protein_grid, p_polar, epsilon, outfile_ensemble, polymer));
+    }
+    outfile_ensemble->close();
+    delete protein_grid;                                                        // free struct grid memory
+    delete outfile_ensemble;                                                    // free filebuffer
+    return 0;
+}
+
+
+// generating 3 protein samples and, only if called with the argument 'ensemble', the ensemble of proteins
+int main(int argc, char *argv[]) {
     // physical constants
     double p_polar = 0.3;                                                       // probability of a polar monomer
     double epsilon = 1.0;                                                       // energy constant
@@ -238,5 +265,9 @@ int main(void) {
     delete protein_grid_low;                                                    // free struct grid memory
     delete outfile_low;                                                         // free filebuffer
 
+    // ensemble of proteins for the statistics (opt-in: 'make run_ensemble')
+    if (argc > 1 && std::string(argv[1]) == "ensemble") {
+        return protein_folding_ensemble(p_polar, epsilon);
+    }
     return 0;
 }
\ No newline at end of file
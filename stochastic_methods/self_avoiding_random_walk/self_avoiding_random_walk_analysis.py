@@ -0,0 +1,107 @@
+import os
+import sys
+import glob
+import multiprocessing
+import numpy as np
+sys.path.append("../..")
+from cvc_data import load_data
+
+
+# node states of the monomers (as written by self_avoiding_random_walk.cpp)
+HYDROPHOBIC = 1                                                         # hydrophobic [H] monomer
+POLAR = 2                                                               # polar [P] monomer
+
+# observables of a polymer (columns of the ensemble analysis)
+observable_columns = ["length", "contacts", "energy", "end_to_end", "gyration_radius"]
+
+
+# returns the lattice of the polymer on the nodes ('m_array', 'n_array') holding the index of the monomer on every node (-1: empty),
+# framed by one empty node on every side so that shifted lattices never wrap around
+def get_index_lattice(m_array, n_array):
+    m_array = np.asarray(m_array, dtype = int) - np.min(m_array) + 1
+    n_array = np.asarray(n_array, dtype = int) - np.min(n_array) + 1
+    lattice = np.full((np.max(m_array) + 2, np.max(n_array) + 2), -1)
+    lattice[m_array, n_array] = np.arange(len(m_array))
+    return lattice
+
+
+# returns the index pairs (i_array, j_array) of all H-H contacts of the polymer: hydrophobic monomers on neighboring nodes that are not
+# neighbors along the chain, each contact found once by comparing the lattice with its copy shifted by one node SOUTH and EAST
+def get_contacts(m_array, n_array, state_array):
+    lattice = get_index_lattice(m_array, n_array)
+    hydrophobic_array = np.append(np.asarray(state_array) == HYDROPHOBIC, False)          # index -1 (empty node): never hydrophobic
+    i_array = np.concatenate((lattice[:-1,:].ravel(), lattice[:,:-1].ravel()))
+    j_array = np.concatenate((lattice[1:,:].ravel(), lattice[:,1:].ravel()))
+    contact = hydrophobic_array[i_array] & hydrophobic_array[j_array] & (np.abs(i_array - j_array) > 1)
+    return i_array[contact], j_array[contact]
+
+
+# returns the midpoints (m, n) of all H-H contacts of the polymer, one row per contact
+def get_contact_midpoints(m_array, n_array, state_array):
+    i_array, j_array = get_contacts(m_array, n_array, state_array)
+    positions = np.column_stack((m_array, n_array)).astype(float)
+    return (positions[i_array] + positions[j_array]) / 2
+
+
+# returns the observables of the polymer (see 'observable_columns'): its length, number of H-H contacts, energy -epsilon per contact,
+# end-to-end distance and radius of gyration (in node lengths)
+def get_observables(m_array, n_array, state_array, epsilon = 1):
+    positions = np.column_stack((m_array, n_array)).astype(float)
+    n_contacts = len(get_contacts(m_array, n_array, state_array)[0])
+    end_to_end = np.linalg.norm(positions[-1] - positions[0])
+    gyration_radius = np.sqrt(np.mean(np.sum((positions - np.mean(positions, axis = 0))**2, axis = 1)))
+    return np.array([len(positions), n_contacts, -epsilon * n_contacts, end_to_end, gyration_radius])
+
+
+# returns the first and the last (exclusive) row of every polymer in the polymer column 'polymer_array' of an ensemble file
+def get_polymer_bounds(polymer_array):
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(polymer_array)) + 1))
+    ends = np.append(starts[1:], len(polymer_array))
+    return starts, ends
+
+
+# returns the observables of the polymers in the rows 'start' to 'end' (whole polymers) of the ensemble file at 'csv_path' (polymer,
+# m, n, node status, energy), read from its memory-mapped binary cache
+def analyze_ensemble_rows(csv_path, start, end, epsilon = 1):
+    data = np.array(load_data(csv_path)[start:end])
+    starts, ends = get_polymer_bounds(data[:,0])
+    m_array, n_array, state_array = data[:,1].astype(int), data[:,2].astype(int), data[:,3].astype(int)
+    return np.array([get_observables(m_array[i:j], n_array[i:j], state_array[i:j], epsilon) for i, j in zip(starts, ends)])
+
+
+# returns the observables of the polymers of the single polymer files (m, n, node status, energy) at 'csv_paths'
+def analyze_polymer_files(csv_paths, epsilon = 1):
+    observables = []
+    for csv_path in csv_paths:
+        data = np.loadtxt(csv_path, delimiter = ",", skiprows = 1, ndmin = 2)
+        observables.append(get_observables(data[:,0].astype(int), data[:,1].astype(int), data[:,2].astype(int), epsilon))
+    return np.array(observables)
+
+
+# runs the analysis 'task' on the argument tuples 'tasks' with 'processes' worker processes (1: in this process), keeping their order
+def map_tasks(task, tasks, processes = 1):
+    if processes == 1:
+        return [task(*args) for args in tasks]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(task, tasks)
+
+
+# returns the observables (dim 0: polymer, dim 1: see 'observable_columns') of all polymers at 'path': either a directory of single
+# polymer files or one ensemble file of concatenated polymers; the polymers are analyzed in chunks of 'chunk_size' polymers spread over
+# 'processes' worker processes
+def analyze_ensemble(path, processes = 1, chunk_size = 2000, epsilon = 1):
+    if os.path.isdir(path):
+        csv_paths = sorted(glob.glob(os.path.join(path, "*.csv")))
+        tasks = [(csv_paths[i:i+chunk_size], epsilon) for i in range(0, len(csv_paths), chunk_size)]
+        return np.concatenate(map_tasks(analyze_polymer_files, tasks, processes))
+
+    # the binary cache is built once here, the workers only map the rows of their chunk of polymers
+    starts, ends = get_polymer_bounds(load_data(path)[:,0])
+    tasks = [(path, starts[i], ends[min(i + chunk_size, len(starts)) - 1], epsilon) for i in range(0, len(starts), chunk_size)]
+    return np.concatenate(map_tasks(analyze_ensemble_rows, tasks, processes))
+
+
+# returns the distinct values of 'length_array' and the mean of 'value_array' over all polymers of each length
+def get_mean_by_length(length_array, value_array):
+    lengths, length_i = np.unique(length_array.astype(int), return_inverse = True)
+    return lengths, np.bincount(length_i, weights = value_array) / np.bincount(length_i)
@@ -1,10 +1,16 @@
 from manim import *
+import sys
+sys.path.append("../..")
+from cvc_data import Dataset
 
 
 # visualization of three proteins (low, medium, and high number of H-H links)
-protein_folding_high_energy_data = np.loadtxt("data/protein_folding_high_energy.csv", delimiter = ",", skiprows = 1)
-protein_folding_medium_energy_data = np.loadtxt("data/protein_folding_medium_energy.csv", delimiter = ",", skiprows = 1)
-protein_folding_low_energy_data = np.loadtxt("data/protein_folding_low_energy.csv", delimiter = ",", skiprows = 1)
+protein_folding_files = {
+    "high": "data/protein_folding_high_energy.csv",
+    "medium": "data/protein_folding_medium_energy.csv",
+    "low": "data/protein_folding_low_energy.csv",
+}
+protein_folding_energy = "low"
 
 
 
@@ -122,9 +128,10 @@ class self_avoiding_random_walk_scene(Scene):
         self.add(canvas, canvas_legend, canvas_quantity)
 
 
-        # iterating through the polymer data
+        # iterating through the lazily opened polymer data
+        protein_folding_data = Dataset(protein_folding_files[protein_folding_energy])
         self.wait(1.5)
-        for monomer in protein_folding_low_energy_data:
+        for monomer in protein_folding_data.iter_rows():
             # add new monomer
             monomer_type = monomer[2]
             monomer_m = int(monomer[0])
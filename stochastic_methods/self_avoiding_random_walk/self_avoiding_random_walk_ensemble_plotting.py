@@ -0,0 +1,53 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import multiprocessing
+from self_avoiding_random_walk_analysis import observable_columns, analyze_ensemble, get_mean_by_length
+
+
+# ensemble of proteins: one concatenated file written by 'make run_ensemble' (or a directory of single protein files)
+protein_folding_ensemble_path = "data/protein_folding_ensemble.csv"
+processes = multiprocessing.cpu_count()
+
+
+if __name__ == "__main__":
+    # data processing (observables of every polymer, analyzed in parallel)
+    observables = analyze_ensemble(protein_folding_ensemble_path, processes = processes)
+    length_array, contacts_array, energy_array, end_to_end_array, gyration_radius_array = observables.T
+    print(f"{len(observables)} polymers: " + ", ".join(f"<{column}> = {mean:.3f}" for column, mean in zip(observable_columns, observables.mean(axis = 0))))
+
+    # mean squared sizes per length and their scaling exponents from a fit R ~ L^nu
+    lengths, end_to_end_mean = get_mean_by_length(length_array, end_to_end_array**2)
+    lengths, gyration_radius_mean = get_mean_by_length(length_array, gyration_radius_array**2)
+    fit_range = lengths > 1
+    nu_end_to_end = np.polyfit(np.log(lengths[fit_range]), np.log(end_to_end_mean[fit_range]), 1)[0] / 2
+    nu_gyration = np.polyfit(np.log(lengths[fit_range]), np.log(gyration_radius_mean[fit_range]), 1)[0] / 2
+
+
+    # plotting
+    fig, ax = plt.subplots(1, 3, figsize=(18,4.5))
+    ax[0].set_xlabel(r'energy $E/\epsilon$')
+    ax[0].set_ylabel(r'number of polymers')
+    ax[0].grid()
+    energy_bins = np.arange(energy_array.min() - 0.5, energy_array.max() + 1.5)
+    ax[0].hist(energy_array, bins = energy_bins, color = "xkcd:red pink", alpha = 0.5)
+    ax[0].set_title(f"Energy of {len(observables)} polymers")
+
+    ax[1].set_xlabel(r'length $L$')
+    ax[1].set_ylabel(r'number of H-H contacts')
+    ax[1].grid()
+    ax[1].hist2d(length_array, contacts_array, bins = (np.arange(length_array.max() + 2) - 0.5, np.arange(contacts_array.max() + 2) - 0.5), cmap = "Blues", cmin = 1)
+    ax[1].set_title(r"H-H contacts over the length")
+
+    ax[2].set_xlabel(r'length $L$')
+    ax[2].set_ylabel(r'size $\sqrt{\langle R^2 \rangle}$')
+    ax[2].set_xscale("log")
+    ax[2].set_yscale("log")
+    ax[2].grid()
+    ax[2].grid(which='minor', color = '#999999', alpha = 0.2, linestyle = '-')
+    ax[2].plot(lengths, np.sqrt(end_to_end_mean), "o", markersize = 2, color = "xkcd:red pink", label = fr"end-to-end distance, $\nu={nu_end_to_end:.2f}$")
+    ax[2].plot(lengths, np.sqrt(gyration_radius_mean), "o", markersize = 2, color = "blue", label = fr"radius of gyration, $\nu={nu_gyration:.2f}$")
+    ax[2].legend(loc="upper left")
+    ax[2].set_title(r"Polymer size over the length")
+
+    plt.savefig('visualizations/self_avoiding_random_walk_ensemble.pdf', facecolor = 'white', bbox_inches='tight')
+    plt.show()